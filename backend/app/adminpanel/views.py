@@ -7,7 +7,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from app.users.models import User
+from app.users.models import User, calc_age
 from app.care.models import CareRelation
 from app.calls.models import CallLog
 from django.utils.timesince import timesince
@@ -37,15 +37,6 @@ def _require_welfare_worker(user: User) -> bool:
     return bool(user and user.is_authenticated and user.is_welfare_worker)
 
 
-def _calc_age(user: User):
-    now_year = timezone.now().year
-    if user.birth_date:
-        return now_year - user.birth_date.year
-    if user.birth_year:
-        return now_year - int(user.birth_year)
-    return None
-
-
 class DashboardView(TemplateView):
     template_name = "adminpanel/dashboard.html"
 
@@ -97,7 +88,7 @@ class DashboardView(TemplateView):
                 {
                     "userId": s.id,
                     "name": s.name,
-                    "age": _calc_age(s),
+                    "age": calc_age(s.birth_date, s.birth_year),
                     "gender": s.gender,
                     "profileImageUrl": s.profile_image_url or "",
                     "status": status,
@@ -135,7 +126,7 @@ class SeniorDetailView(TemplateView):
 
         senior = User.objects.filter(id=senior_id, is_active=True).first()
         ctx["senior"] = senior
-        ctx["seniorAge"] = _calc_age(senior)
+        ctx["seniorAge"] = calc_age(senior.birth_date, senior.birth_year)
 
         calls = (
             CallLog.objects.filter(senior_id=senior_id)
@@ -152,7 +143,7 @@ class SeniorDetailView(TemplateView):
                     "callId": c.call_id,
                     "peerName": c.peer.name,
                     "peerId": c.peer.id,
-                    "peerAge": _calc_age(c.peer),
+                    "peerAge": calc_age(c.peer.birth_date, c.peer.birth_year),
                     "peerGender": c.peer.gender,
                     "endedAt": c.ended_at,
                     "status": status,
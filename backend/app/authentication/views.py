@@ -10,6 +10,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from app.users.models import User
+from app.config.jwt_auth_middleware import invalidate_ws_user
 from .services import issue_otp, issue_jwt_for_user, _normalize_phone, verify_otp_only
 from .onboarding import (
     issue_onboarding_token,
@@ -220,6 +221,7 @@ class WithdrawView(APIView):
         user: User = request.user
         user.is_active = False
         user.save(update_fields=["is_active"])
+        invalidate_ws_user(user.id)
         return ok(None)
 
 
@@ -0,0 +1,203 @@
+# app/common/metrics.py
+# 프로세스 안 메트릭 + Prometheus text 포맷 출력 (/metrics)
+# prometheus_client 없이 Counter/Histogram만 최소 구현. 워커(프로세스)마다 따로 집계됨
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Sequence, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, HttpResponseForbidden
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []
+
+
+def _labels(names: Sequence[str], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        key = tuple(str(v) for v in labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = list(self._values.items())
+        for key, v in items:
+            yield f"{self.name}{_labels(self.label_names, key)} {v}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label 값 -> [bucket별 개수..., +Inf 개수], 합계
+        self._values: Dict[Tuple[str, ...], Tuple[list, list]] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, *labels) -> None:
+        key = tuple(str(v) for v in labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[i] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = [(k, list(c), t[0]) for k, (c, t) in self._values.items()]
+        names = self.label_names + ("le",)
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                yield f"{self.name}_bucket{_labels(names, key + (repr(bound),))} {cumulative}"
+            cumulative += counts[-1]
+            yield f"{self.name}_bucket{_labels(names, key + ('+Inf',))} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, key)} {total}"
+            yield f"{self.name}_count{_labels(self.label_names, key)} {cumulative}"
+
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "REST view latency",
+    ("view", "method", "status"),
+)
+DB_QUERIES = Counter("db_queries_total", "DB queries executed", ("view",))
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "DB query latency", ("view",))
+REDIS_COMMANDS = Counter(
+    "redis_commands_total", "Redis commands sent (pipeline = 1)", ("command",)
+)
+SIGNALING_LATENCY = Histogram(
+    "signaling_message_duration_seconds",
+    "SignalingConsumer receive handling latency",
+    ("type",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+SIGNALING_CLOSED = Counter(
+    "signaling_closed_total", "Signaling connections closed by server", ("code",)
+)
+
+
+# ice-batch 누적 통계 (app.matches.ice.record_batch)
+SIGNALING_ICE_BATCHES = Counter(
+    "signaling_ice_batches_total", "ice-batch messages flushed"
+)
+SIGNALING_ICE_CANDIDATES = Counter(
+    "signaling_ice_candidates_total", "ICE candidates sent in ice-batch"
+)
+SIGNALING_ICE_BATCH_SIZE = Counter(
+    "signaling_ice_batch_size_total",
+    "ice-batch count by candidates per batch",
+    ("size",),
+)
+SIGNALING_ICE_DELAY = Counter(
+    "signaling_ice_delay_seconds_total",
+    "Delay added by ICE coalescing (sum over batches)",
+)
+
+
+def render() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    func = match.func
+    cls = getattr(func, "view_class", None) or getattr(func, "cls", None)
+    return cls.__name__ if cls else (match.view_name or func.__name__)
+
+
+class MetricsMiddleware:
+    """
+    view별 응답 시간 + 그 요청에서 실행된 DB 쿼리 수/시간
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = []
+
+        def record_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(record_query):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        view = _view_name(request)
+        HTTP_LATENCY.observe(elapsed, view, request.method, response.status_code)
+        if queries:
+            DB_QUERIES.inc(view, amount=len(queries))
+            for q in queries:
+                DB_QUERY_SECONDS.observe(q, view)
+        return response
+
+
+def metrics_view(request):
+    """
+    GET /metrics (Prometheus text). METRICS_TOKEN을 ?token= 또는 Bearer로 전달
+    토큰이 설정 안 돼 있으면 DEBUG에서만 열어 둠
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not token and not settings.DEBUG:
+        return HttpResponseForbidden()
+    if token:
+        given = request.GET.get("token") or ""
+        auth = request.headers.get("Authorization", "")
+        if auth.startswith("Bearer "):
+            given = auth[len("Bearer ") :]
+        if given != token:
+            return HttpResponseForbidden()
+    return HttpResponse(render(), content_type="text/plain; version=0.0.4")
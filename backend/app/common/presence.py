@@ -0,0 +1,153 @@
+# app/common/presence.py
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from django.conf import settings
+
+from app.common.redis_client import get_async_redis, get_async_script, get_redis
+
+PRESENCE_TTL_SEC = 70  # 프론트가 30초마다 ping하면 안전
+
+# 전체 접속 상태를 zset 하나로 (유저별 SET EX 키 대체)
+#   presence:last_seen  user_id -> score
+#     score > 0 : 마지막 ping 시각. now - PRESENCE_TTL_SEC 이후면 온라인
+#     score < 0 : -(소켓이 닫힌 시각). 명시적으로 오프라인 (last seen은 abs)
+# 만료는 키 TTL이 아니라 sweep_presence가 훑어서 처리 (오프라인 알림 + 오래된 항목 삭제)
+LAST_SEEN_KEY = "presence:last_seen"
+SWEEP_CURSOR_KEY = "presence:sweep:cursor"
+
+
+def connections_key(user_id: int) -> str:
+    # presence WebSocket들: channel_name -> 마지막 ping 시각 (탭/기기 여러 개)
+    return f"presence:conns:{user_id}"
+
+
+def retention_sec() -> int:
+    # "N분 전 접속" 표시용으로 last seen을 얼마나 들고 있을지
+    return int(getattr(settings, "PRESENCE_LAST_SEEN_RETENTION_DAYS", 30)) * 86400
+
+
+def _online_cutoff(now: float) -> float:
+    return now - PRESENCE_TTL_SEC
+
+
+def touch(user_id: int) -> bool:
+    """
+    return: 이번에 오프라인 -> 온라인이 됐는지
+    """
+    now = time.time()
+    pipe = get_redis().pipeline()
+    pipe.zscore(LAST_SEEN_KEY, user_id)
+    pipe.zadd(LAST_SEEN_KEY, {user_id: now})
+    prev, _ = pipe.execute()
+    return prev is None or prev < _online_cutoff(now)
+
+
+def online_user_ids(user_ids: Iterable[int]) -> Set[int]:
+    ids = list(user_ids)
+    if not ids:
+        return set()
+    cutoff = _online_cutoff(time.time())
+    scores = get_redis().zmscore(LAST_SEEN_KEY, ids)
+    return {uid for uid, s in zip(ids, scores) if s is not None and s >= cutoff}
+
+
+def last_seen(user_ids: Iterable[int]) -> Dict[int, Optional[float]]:
+    """
+    user_id -> 마지막 접속 시각(epoch). 기록 없으면 None
+    """
+    ids = list(user_ids)
+    if not ids:
+        return {}
+    scores = get_redis().zmscore(LAST_SEEN_KEY, ids)
+    return {uid: (abs(s) if s is not None else None) for uid, s in zip(ids, scores)}
+
+
+def online_count() -> int:
+    return int(get_redis().zcount(LAST_SEEN_KEY, _online_cutoff(time.time()), "+inf"))
+
+
+def sweep(now: Optional[float] = None) -> List[int]:
+    """
+    지난 sweep 이후 ping이 끊겨 오프라인이 된 유저 목록 (소켓 close로 이미 알린 유저는 제외)
+    + retention 지난 항목 삭제. 워커 하나에서 주기적으로 호출
+    """
+    now = time.time() if now is None else now
+    cutoff = _online_cutoff(now)
+    r = get_redis()
+    prev = r.get(SWEEP_CURSOR_KEY)
+    # 처음이면 TTL 한 번 분량만 봄
+    start = float(prev) if prev else cutoff - PRESENCE_TTL_SEC
+    expired = r.zrangebyscore(LAST_SEEN_KEY, f"({start}", f"({cutoff}")
+
+    old = now - retention_sec()
+    pipe = r.pipeline()
+    pipe.set(SWEEP_CURSOR_KEY, cutoff)
+    pipe.zremrangebyscore(LAST_SEEN_KEY, 0, f"({old}")
+    pipe.zremrangebyscore(LAST_SEEN_KEY, f"({-old}", "(0")
+    pipe.execute()
+    return [int(uid) for uid in expired]
+
+
+# --- presence WebSocket (HTTP ping 대체) -------------------------------------
+# KEYS[1]=last_seen, KEYS[2]=conns
+# ARGV[1]=channel, ARGV[2]=now, ARGV[3]=TTL, ARGV[4]=user_id
+# 연결/ping 공용. ping이 TTL 넘게 끊긴 connection(죽은 워커)은 같이 정리
+# return: 1이면 이번에 오프라인 -> 온라인
+_TOUCH_LUA = """
+local now, ttl = tonumber(ARGV[2]), tonumber(ARGV[3])
+local prev = tonumber(redis.call('ZSCORE', KEYS[1], ARGV[4]) or '-1')
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', '(' .. (now - ttl))
+redis.call('ZADD', KEYS[2], now, ARGV[1])
+redis.call('EXPIRE', KEYS[2], ttl)
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+if prev >= now - ttl then
+  return 0
+end
+return 1
+"""
+
+# 같은 인자. 마지막 connection이 닫히면 sweep을 기다리지 않고 바로 오프라인
+# return: 1이면 이번에 온라인 -> 오프라인
+_LEAVE_LUA = """
+local now, ttl = tonumber(ARGV[2]), tonumber(ARGV[3])
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', '(' .. (now - ttl))
+if redis.call('ZCARD', KEYS[2]) > 0 then
+  return 0
+end
+redis.call('DEL', KEYS[2])
+local prev = tonumber(redis.call('ZSCORE', KEYS[1], ARGV[4]) or '-1')
+redis.call('ZADD', KEYS[1], -now, ARGV[4])
+if prev >= now - ttl then
+  return 1
+end
+return 0
+"""
+
+
+async def _run(name: str, source: str, user_id: int, channel: str) -> bool:
+    res = await get_async_script(name, source)(
+        keys=[LAST_SEEN_KEY, connections_key(user_id)],
+        args=[channel, time.time(), PRESENCE_TTL_SEC, user_id],
+        client=get_async_redis(),
+    )
+    return bool(int(res))
+
+
+async def connect(user_id: int, channel: str) -> bool:
+    """
+    return: 새로 온라인이 됐는지
+    """
+    return await _run("presence_touch", _TOUCH_LUA, user_id, channel)
+
+
+# ping도 같은 touch (sweep으로 이미 빠졌으면 다시 온라인 -> True)
+ping = connect
+
+
+async def disconnect(user_id: int, channel: str) -> bool:
+    """
+    return: 오프라인이 됐는지 (다른 탭/기기가 남아 있으면 False)
+    """
+    return await _run("presence_leave", _LEAVE_LUA, user_id, channel)
@@ -1,9 +1,19 @@
 # app/common/redis_client.py
+import asyncio
+import weakref
+
 import redis
+import redis.asyncio as aioredis
 from django.conf import settings
 
+from app.common.metrics import REDIS_COMMANDS
 
 _redis = None
+# redis.asyncio 커넥션은 만든 이벤트 루프에 묶임 -> 루프마다 pool 1개
+_async_clients = weakref.WeakKeyDictionary()
+# Lua 스크립트 (이름 -> Script). 모듈마다 따로 두지 않고 여기서 한 번만 등록
+_scripts = {}
+_async_scripts = {}
 
 
 def get_redis():
@@ -15,4 +25,76 @@ def get_redis():
             db=settings.REDIS_DB,
             decode_responses=True,  # bytes 말고 str로 받게
         )
-    return _redis
\ No newline at end of file
+        _count_commands(_redis)
+    return _redis
+
+
+def get_async_redis():
+    """
+    consumer 같은 async 코드용. 동기 get_redis()를 async def 안에서 부르면
+    Redis 왕복 동안 이벤트 루프 전체가 멈춤
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            max_connections=int(getattr(settings, "REDIS_ASYNC_MAX_CONNECTIONS", 50)),
+            decode_responses=True,
+        )
+        _count_commands(client, is_async=True)
+        _async_clients[loop] = client
+    return client
+
+
+def get_script(name: str, source: str):
+    """
+    동기 client용 Lua 스크립트. name은 앱 전체에서 겹치지 않게 (모듈 prefix)
+    """
+    s = _scripts.get(name)
+    if s is None:
+        s = get_redis().register_script(source)
+        _scripts[name] = s
+    return s
+
+
+def get_async_script(name: str, source: str):
+    """
+    async client용. 스크립트 객체는 sha만 들고 있음 -> 호출 때 client=get_async_redis()로
+    현재 루프의 client를 넘김
+    """
+    s = _async_scripts.get(name)
+    if s is None:
+        s = get_async_redis().register_script(source)
+        _async_scripts[name] = s
+    return s
+
+
+def _count_commands(client, is_async: bool = False) -> None:
+    """
+    /metrics용 명령 수 집계. pipeline은 왕복 1번이라 PIPELINE 1개로 셈
+    (Lua 스크립트는 EVALSHA로 잡힘)
+    """
+    execute = client.execute_command
+    make_pipeline = client.pipeline
+
+    if is_async:
+
+        async def execute_command(*args, **options):
+            REDIS_COMMANDS.inc(str(args[0]).upper())
+            return await execute(*args, **options)
+
+    else:
+
+        def execute_command(*args, **options):
+            REDIS_COMMANDS.inc(str(args[0]).upper())
+            return execute(*args, **options)
+
+    def pipeline(*args, **kwargs):
+        REDIS_COMMANDS.inc("PIPELINE")
+        return make_pipeline(*args, **kwargs)
+
+    client.execute_command = execute_command
+    client.pipeline = pipeline
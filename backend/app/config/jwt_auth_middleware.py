@@ -1,25 +1,218 @@
 # app/config/jwt_auth_middleware.py
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
 from urllib.parse import parse_qs
 
 from channels.db import database_sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+
+from app.common.redis_client import get_async_redis, get_redis
+
+# 검증된 user_id -> 활성 유저 캐시 (재배포 직후 재접속 폭주 때 users 테이블 보호)
+# 1차: 프로세스 안 LRU, 2차: Redis (워커끼리 공유)
+# 탈퇴(is_active=False)는 invalidate_ws_user로 지움. 다른 워커의 LRU에는
+# ws:auth:revoked zset(user_id -> 시각)으로 알림 -> 각 워커가 poll 주기마다 읽어서 pop
+CACHED_FIELDS = ("id", "name", "is_active")
+REVOKED_KEY = "ws:auth:revoked"
+# 워커 시계 차이/조회 사이에 들어온 항목을 놓치지 않게 이만큼 겹쳐 읽음
+_REVOKE_OVERLAP_SEC = 1.0
+
+# 이 워커가 어디까지 읽었는지 (시작 시점엔 LRU가 비어 있으니 지금부터)
+_revoked_since = time.time()
+_next_revoke_poll = 0.0
+
+
+def ws_user_key(user_id: int) -> str:
+    return f"ws:auth:user:{user_id}"
+
+
+def _local_ttl_sec() -> float:
+    return float(getattr(settings, "WS_AUTH_LOCAL_TTL_SEC", 30))
+
+
+def _redis_ttl_sec() -> int:
+    return int(getattr(settings, "WS_AUTH_REDIS_TTL_SEC", 300))
+
+
+def _local_max() -> int:
+    return int(getattr(settings, "WS_AUTH_LOCAL_MAX", 10000))
+
+
+def _revoke_poll_sec() -> float:
+    return float(getattr(settings, "WS_AUTH_REVOKE_POLL_SEC", 1))
+
+
+class _LRU:
+    """
+    크기 제한 + TTL 있는 LRU (user_id -> (만료 시각, 필드 dict))
+    """
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[dict]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value: dict) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + _local_ttl_sec(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > _local_max():
+                self._data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+_local = _LRU()
+
+
+def _user_id_from_token(token: str) -> Optional[int]:
+    """
+    서명/만료 검증은 여기서 딱 한 번
+    """
+    if not token:
+        return None
+    try:
+        payload = UntypedToken(token).payload
+    except Exception:
+        return None
+    user_id = payload.get(api_settings.USER_ID_CLAIM)
+    try:
+        return int(user_id) if user_id else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_user(fields: dict):
+    # 캐시한 필드만 채운 User (나머지 필드는 접근 시 지연 로딩, save도 로딩된 필드만)
+    User = get_user_model()
+    # from_db는 values를 모델 필드 순서로 받음
+    names = [f.attname for f in User._meta.concrete_fields if f.attname in fields]
+    return User.from_db(None, names, [fields[n] for n in names])
 
 
 @database_sync_to_async
-def get_user_from_token(token: str):
+def _load_active_user(user_id: int) -> Optional[dict]:
+    User = get_user_model()
+    return (
+        User.objects.filter(id=user_id, is_active=True).values(*CACHED_FIELDS).first()
+    )
+
+
+async def _apply_revocations() -> None:
+    """
+    다른 워커에서 invalidate된 유저를 이 워커 LRU에서도 지움 (poll 주기에 한 번만 조회)
+    """
+    global _revoked_since, _next_revoke_poll
+    now = time.monotonic()
+    if now < _next_revoke_poll:
+        return
+    _next_revoke_poll = now + _revoke_poll_sec()
+
+    started = time.time()
+    try:
+        user_ids = await get_async_redis().zrangebyscore(
+            REVOKED_KEY, _revoked_since - _REVOKE_OVERLAP_SEC, "+inf"
+        )
+    except Exception:
+        # Redis 장애 때는 TTL 만료에 맡김
+        return
+    for uid in user_ids:
+        try:
+            _local.pop(int(uid))
+        except (TypeError, ValueError):
+            continue
+    _revoked_since = started
+
+
+async def _cached_fields(user_id: int) -> Optional[dict]:
+    await _apply_revocations()
+    fields = _local.get(user_id)
+    if fields is not None:
+        return fields
+
+    r = get_async_redis()
+    key = ws_user_key(user_id)
+    try:
+        raw = await r.get(key)
+    except Exception:
+        raw = None
+    if raw:
+        fields = json.loads(raw)
+        _local.set(user_id, fields)
+        return fields
+
+    fields = await _load_active_user(user_id)
+    if fields is None:
+        # 없는/비활성 유저는 캐시하지 않음 (가입 직후 바로 접속 가능하게)
+        return None
+    try:
+        await r.set(key, json.dumps(fields), ex=_redis_ttl_sec())
+    except Exception:
+        pass
+    _local.set(user_id, fields)
+    return fields
+
+
+async def authenticate_ws_token(token: str):
     """
-    SimpleJWT 토큰 검증 후 유저 반환.
-    실패 시 AnonymousUser 반환.
+    토큰 -> 활성 User, 실패하면 None
+    """
+    user_id = _user_id_from_token(token)
+    if not user_id:
+        return None
+    fields = await _cached_fields(user_id)
+    return _as_user(fields) if fields else None
+
+
+def invalidate_ws_user(user_id: int) -> None:
+    """
+    탈퇴/비활성화 시 호출 (동기 뷰용). 다른 워커 LRU는 REVOKED_KEY로 알림
+    """
+    _local.pop(user_id)
+    now = time.time()
+    # LRU 항목은 local TTL 안에 어차피 만료 -> 그보다 오래된 알림은 정리
+    keep_sec = _local_ttl_sec() + 60
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.delete(ws_user_key(user_id))
+        pipe.zadd(REVOKED_KEY, {str(user_id): now})
+        pipe.zremrangebyscore(REVOKED_KEY, "-inf", now - keep_sec)
+        pipe.execute()
+    except Exception:
+        pass
+
+
+def _token_from_scope(scope) -> str:
+    """
+    ws://<host>/ws/...?token=<ACCESS_TOKEN>
     """
     try:
-        jwt_auth = JWTAuthentication()
-        validated = jwt_auth.get_validated_token(token)
-        user = jwt_auth.get_user(validated)
-        return user
+        qs = parse_qs(scope.get("query_string", b"").decode("utf-8"))
     except Exception:
-        return AnonymousUser()
+        return ""
+    token_list = qs.get("token") or []
+    return token_list[0] if token_list else ""
 
 
 class JwtAuthMiddleware:
@@ -31,18 +224,20 @@ class JwtAuthMiddleware:
         self.inner = inner
 
     async def __call__(self, scope, receive, send):
-        query_string = scope.get("query_string", b"").decode()
-        qs = parse_qs(query_string)
-        token_list = qs.get("token", [])
-        token = token_list[0] if token_list else None
-
-        if token:
-            scope["user"] = await get_user_from_token(token)
-        else:
-            scope["user"] = AnonymousUser()
-
+        user = await authenticate_ws_token(_token_from_scope(scope))
+        scope = dict(scope, user=user or AnonymousUser())
         return await self.inner(scope, receive, send)
 
 
 def JwtAuthMiddlewareStack(inner):
     return JwtAuthMiddleware(inner)
+
+
+def scope_user(scope):
+    """
+    consumer용: JwtAuthMiddleware가 검증해서 넣어둔 유저. 인증 실패면 None
+    """
+    user = scope.get("user")
+    if user is None or not getattr(user, "is_authenticated", False):
+        return None
+    return user
@@ -1,12 +1,20 @@
 from channels.routing import ProtocolTypeRouter, URLRouter
 from django.core.asgi import get_asgi_application
 import app.matches.routing
+import app.me.routing
+from app.config.jwt_auth_middleware import JwtAuthMiddlewareStack
 
 django_asgi_app = get_asgi_application()
 
 application = ProtocolTypeRouter(
     {
         "http": django_asgi_app,
-        "websocket": URLRouter(app.matches.routing.websocket_urlpatterns),
+        # 모든 WS는 같은 인증 레이어를 거침 -> consumer는 scope["user"]만 확인
+        "websocket": JwtAuthMiddlewareStack(
+            URLRouter(
+                app.matches.routing.websocket_urlpatterns
+                + app.me.routing.websocket_urlpatterns
+            )
+        ),
     }
 )
@@ -21,6 +21,27 @@ REDIS_URL = os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/0")
 REDIS_HOST = os.environ.get("REDIS_HOST", "127.0.0.1")
 REDIS_PORT = int(os.environ.get("REDIS_PORT", "6379"))
 REDIS_DB = int(os.environ.get("REDIS_DB", "0"))
+# consumer용 redis.asyncio 클라이언트 pool 크기 (이벤트 루프당)
+REDIS_ASYNC_MAX_CONNECTIONS = int(os.environ.get("REDIS_ASYNC_MAX_CONNECTIONS", "50"))
+
+# 매칭: "random"(전체 대기열 선착순) | "proximity"(geohash 셀 근처부터)
+#       | "batch"(대기열에 넣기만, run_matcher 워커가 점수 기반으로 짝짓기)
+MATCH_MODE = os.environ.get("MATCH_MODE", "random")
+MATCH_GEOHASH_PRECISION = int(os.environ.get("MATCH_GEOHASH_PRECISION", "5"))  # 약 5km 셀
+MATCH_GEOHASH_MAX_RING = int(os.environ.get("MATCH_GEOHASH_MAX_RING", "2"))
+MATCH_PROXIMITY_FALLBACK_SEC = int(os.environ.get("MATCH_PROXIMITY_FALLBACK_SEC", "20"))
+MATCH_BATCH_INTERVAL_MS = int(os.environ.get("MATCH_BATCH_INTERVAL_MS", "300"))
+MATCH_BATCH_MAX_POOL = int(os.environ.get("MATCH_BATCH_MAX_POOL", "300"))
+# 지역 shard: 대기열을 지역별 key로 나눔 ({shard} hash tag, Redis Cluster 가능)
+# batch면 run_matcher --shard <name> 워커를 shard마다 (--shard 없으면 워커 하나가 전부 순회)
+MATCH_SHARDING = os.environ.get("MATCH_SHARDING", "0") == "1"
+MATCH_SHARD_SPILL_SEC = int(os.environ.get("MATCH_SHARD_SPILL_SEC", "15"))
+# 최근 매칭 상대: 이 시간 안에 만난 사람과는 다시 매칭하지 않음 (0이면 끔)
+MATCH_RECENT_PARTNER_SEC = int(os.environ.get("MATCH_RECENT_PARTNER_SEC", str(6 * 3600)))
+MATCH_RECENT_PARTNER_MAX = int(os.environ.get("MATCH_RECENT_PARTNER_MAX", "200"))
+# reap_match_sessions: presence 없이 이 시간 넘게 대기/진행 중이면 취소
+MATCH_WAITING_TTL_SEC = int(os.environ.get("MATCH_WAITING_TTL_SEC", "120"))
+MATCH_SESSION_TTL_SEC = int(os.environ.get("MATCH_SESSION_TTL_SEC", "3600"))
 
 
 SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", "")
@@ -73,6 +94,8 @@ CHANNEL_LAYERS = {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
         "CONFIG": {
             "hosts": [(REDIS_HOST, REDIS_PORT)],
+            # channel별 대기 메시지 상한 (넘으면 ChannelFull -> 그 메시지는 버림)
+            "capacity": int(os.environ.get("CHANNEL_LAYER_CAPACITY", "100")),
         },
     }
 }
@@ -92,6 +115,53 @@ SIMPLE_JWT = {
     "SIGNING_KEY": os.environ.get("JWT_SECRET", SECRET_KEY),
 }
 
+# 시그널링 방 멤버 heartbeat: stale 초 넘게 소식 없는 connection은 peerCount에서 빠짐
+SIGNALING_HEARTBEAT_SEC = int(os.environ.get("SIGNALING_HEARTBEAT_SEC", "15"))
+SIGNALING_MEMBER_STALE_SEC = int(os.environ.get("SIGNALING_MEMBER_STALE_SEC", "45"))
+# 시그널링: ice 후보를 몇 ms 모아서 ice-batch로 중계 (0이면 끔)
+SIGNALING_ICE_COALESCE_MS = int(os.environ.get("SIGNALING_ICE_COALESCE_MS", "0"))
+SIGNALING_ICE_BATCH_MAX = int(os.environ.get("SIGNALING_ICE_BATCH_MAX", "32"))
+
+# 시그널링 메시지 한도 (token bucket: 초당 개수 / 최대 누적), 넘으면 close 4429
+SIGNALING_RATE_PER_SEC = int(os.environ.get("SIGNALING_RATE_PER_SEC", "20"))
+SIGNALING_RATE_BURST = int(os.environ.get("SIGNALING_RATE_BURST", "60"))
+SIGNALING_SESSION_RATE_PER_SEC = int(os.environ.get("SIGNALING_SESSION_RATE_PER_SEC", "50"))
+SIGNALING_SESSION_RATE_BURST = int(os.environ.get("SIGNALING_SESSION_RATE_BURST", "150"))
+# connection별 서버 -> 클라 대기열 크기, 넘치면 close 4408
+SIGNALING_OUTBOUND_QUEUE = int(os.environ.get("SIGNALING_OUTBOUND_QUEUE", "256"))
+
+# WS 접속 인증 캐시 (JwtAuthMiddleware): 프로세스 LRU -> Redis -> DB
+WS_AUTH_LOCAL_TTL_SEC = int(os.environ.get("WS_AUTH_LOCAL_TTL_SEC", "30"))
+WS_AUTH_LOCAL_MAX = int(os.environ.get("WS_AUTH_LOCAL_MAX", "10000"))
+WS_AUTH_REDIS_TTL_SEC = int(os.environ.get("WS_AUTH_REDIS_TTL_SEC", "300"))
+# 다른 워커의 탈퇴 알림(ws:auth:revoked)을 몇 초마다 확인할지
+WS_AUTH_REVOKE_POLL_SEC = float(os.environ.get("WS_AUTH_REVOKE_POLL_SEC", "1"))
+
+# presence:last_seen zset: sweep_presence 주기, "N분 전 접속" 보관 기간
+PRESENCE_SWEEP_INTERVAL_SEC = float(os.environ.get("PRESENCE_SWEEP_INTERVAL_SEC", "5"))
+PRESENCE_LAST_SEEN_RETENTION_DAYS = int(
+    os.environ.get("PRESENCE_LAST_SEEN_RETENTION_DAYS", "30")
+)
+
+# 친구 목록 인덱스(friends:index:<uid>) 수명. sweep 전 ping 만료는 이 안에 반영됨
+FRIEND_INDEX_TTL_SEC = int(os.environ.get("FRIEND_INDEX_TTL_SEC", "60"))
+
+# User.phone_hash HMAC 키 (비우면 SECRET_KEY). 바꾸면 저장된 phone_hash를 다시 계산해야 함
+PHONE_HASH_KEY = os.environ.get("PHONE_HASH_KEY", "")
+
+# POST /api/friends/import 한 번에 받는 연락처 수
+FRIEND_IMPORT_MAX = int(os.environ.get("FRIEND_IMPORT_MAX", "1000"))
+# 유저별 시간당 가져올 수 있는 연락처 수 (token bucket, 가입 여부 훑기 방지)
+FRIEND_IMPORT_RATE_PER_HOUR = int(os.environ.get("FRIEND_IMPORT_RATE_PER_HOUR", "3000"))
+
+# 알 수도 있는 사람 (compute_friend_suggestions)
+FRIEND_SUGGEST_TOP_K = int(os.environ.get("FRIEND_SUGGEST_TOP_K", "20"))
+FRIEND_SUGGEST_TTL_SEC = int(os.environ.get("FRIEND_SUGGEST_TTL_SEC", str(60 * 60 * 48)))
+FRIEND_SUGGEST_HUB_MAX = int(os.environ.get("FRIEND_SUGGEST_HUB_MAX", "500"))
+
+# /metrics (Prometheus) 접근 토큰. 비우면 DEBUG일 때만 열리고 그 외에는 403
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
@@ -103,6 +173,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "app.common.metrics.MetricsMiddleware",
 ]
 
 
@@ -4,6 +4,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from app.common.metrics import metrics_view
+
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -18,6 +20,7 @@ urlpatterns = [
     path("api/me/", include("app.me.urls")),
     path("api/calls/", include("app.calls.urls")),
     path("adminpanel/", include("app.adminpanel.urls")),
+    path("metrics", metrics_view),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,102 @@
+# app/friends/contacts.py
+import re
+from typing import Iterable, List, Set
+
+from django.conf import settings
+
+from app.authentication.services import _normalize_phone
+from app.friends import fanout
+from app.friends import index as friend_index
+from app.friends.models import Friend
+from app.matches import ratelimit
+from app.users.models import User, key_phone_hash
+
+# 연락처로 친구 한꺼번에 추가 (/api/friends/add 를 연락처마다 부르지 않게)
+# 번호는 그대로(숫자만 남김) 또는 sha256(숫자만 남긴 번호) hex로 받음
+# hex는 서버 키로 다시 HMAC해서 User.phone_hash와 비교 (key_phone_hash)
+CHUNK_SIZE = 500  # IN (...) 한 번에 넣을 개수
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def max_contacts() -> int:
+    return int(getattr(settings, "FRIEND_IMPORT_MAX", 1000))
+
+
+def rate_key(user_id: int) -> str:
+    return f"friends:import:rate:{user_id}"
+
+
+def allow_import(user_id: int, count: int) -> bool:
+    """
+    유저별 token bucket (연락처 1개 = 토큰 1개). 번호를 바꿔 가며 가입 여부를 훑는 것 방지
+    """
+    per_hour = float(getattr(settings, "FRIEND_IMPORT_RATE_PER_HOUR", 3000))
+    burst = max(float(max_contacts()), per_hour)
+    return ratelimit.bucket_allow(rate_key(user_id), per_hour / 3600, burst, count)
+
+
+def _chunks(values: List, size: int = CHUNK_SIZE):
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def clean_phones(values: Iterable) -> List[str]:
+    """
+    숫자가 들어 있는 문자열만 받음. 아니면 ValueError (str()로 바꾸면 {"a": 1}도 "1"이 됨)
+    """
+    out = set()
+    for v in values:
+        phone = _normalize_phone(v) if isinstance(v, str) else ""
+        if not phone:
+            raise ValueError("INVALID_PHONE_NUMBER")
+        out.add(phone)
+    return sorted(out)
+
+
+def clean_hashes(values: Iterable) -> List[str]:
+    out = set()
+    for v in values:
+        h = v.strip().lower() if isinstance(v, str) else ""
+        if not _HASH_RE.match(h):
+            raise ValueError("INVALID_PHONE_HASH")
+        out.add(h)
+    return sorted(out)
+
+
+def match_users(user_id: int, phones: List[str], hashes: List[str]) -> Set[int]:
+    ids: Set[int] = set()
+    active = User.objects.filter(is_active=True).exclude(id=user_id)
+    for chunk in _chunks(phones):
+        ids.update(active.filter(phone_number__in=chunk).values_list("id", flat=True))
+    keyed = [key_phone_hash(h) for h in hashes]
+    for chunk in _chunks(keyed):
+        ids.update(active.filter(phone_hash__in=chunk).values_list("id", flat=True))
+    return ids
+
+
+def import_contacts(user_id: int, phones: List[str], hashes: List[str]) -> dict:
+    """
+    return: {"matched": 가입된 연락처 수, "added": 새로 추가된 수, "userIds": 새 친구 id}
+    """
+    matched = sorted(match_users(user_id, phones, hashes))
+
+    existing: Set[int] = set()
+    for chunk in _chunks(matched):
+        existing.update(
+            Friend.objects.filter(
+                user_id=user_id, friend_user_id__in=chunk
+            ).values_list("friend_user_id", flat=True)
+        )
+    new_ids = [uid for uid in matched if uid not in existing]
+
+    if new_ids:
+        # 동시에 같은 친구를 추가해도 unique_together에 걸린 행만 건너뜀
+        Friend.objects.bulk_create(
+            [Friend(user_id=user_id, friend_user_id=uid) for uid in new_ids],
+            ignore_conflicts=True,
+            batch_size=CHUNK_SIZE,
+        )
+        friend_index.invalidate(user_id)
+        fanout.add_follower_many(new_ids, user_id)
+
+    return {"matched": len(matched), "added": len(new_ids), "userIds": new_ids}
@@ -0,0 +1,98 @@
+# app/friends/fanout.py
+from typing import List
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from app.common.redis_client import get_redis
+from app.friends import index as friend_index
+from app.friends.models import Friend
+
+# 친구 접속 상태 실시간 push (FriendListView 폴링 대체)
+#   friends:of:<uid>  set  uid를 친구 목록에 둔 유저들 (Friend.friend_of 역인덱스)
+#   -> presence 전환 1번에 DB 조회 없이 받을 사람 목록을 얻음
+# 친구 0명도 캐시하려고 EMPTY_MEMBER를 같이 넣어 둠 (user id는 1부터)
+FOLLOWERS_TTL_SEC = 60 * 60 * 24
+EMPTY_MEMBER = "0"
+
+
+def followers_key(user_id: int) -> str:
+    return f"friends:of:{user_id}"
+
+
+def presence_group(user_id: int) -> str:
+    # ws/presence/에 붙어 있는 그 유저의 connection들
+    return f"presence_user_{user_id}"
+
+
+def followers(user_id: int) -> List[int]:
+    r = get_redis()
+    members = r.smembers(followers_key(user_id))
+    if not members:
+        ids = list(
+            Friend.objects.filter(friend_user_id=user_id).values_list(
+                "user_id", flat=True
+            )
+        )
+        pipe = r.pipeline()
+        pipe.sadd(followers_key(user_id), EMPTY_MEMBER, *ids)
+        pipe.expire(followers_key(user_id), FOLLOWERS_TTL_SEC)
+        pipe.execute()
+        return ids
+    return [int(m) for m in members if m != EMPTY_MEMBER]
+
+
+def add_follower(user_id: int, follower_id: int) -> None:
+    """
+    FriendAdd: follower_id가 user_id를 친구로 추가. 역인덱스가 아직 없으면 다음 조회 때 DB에서 만듦
+    """
+    r = get_redis()
+    if r.exists(followers_key(user_id)):
+        r.sadd(followers_key(user_id), follower_id)
+
+
+def add_follower_many(user_ids: List[int], follower_id: int) -> None:
+    """
+    연락처 가져오기처럼 한 번에 여러 명 추가: add_follower를 파이프라인 2번으로
+    """
+    if not user_ids:
+        return
+    r = get_redis()
+    pipe = r.pipeline(transaction=False)
+    for uid in user_ids:
+        pipe.exists(followers_key(uid))
+    built = pipe.execute()
+    pipe = r.pipeline(transaction=False)
+    for uid, exists in zip(user_ids, built):
+        if exists:
+            pipe.sadd(followers_key(uid), follower_id)
+    pipe.execute()
+
+
+def publish_presence(user_id: int, online: bool) -> int:
+    """
+    user_id가 온라인/오프라인이 됐을 때: 친구 목록 인덱스 갱신 + 팔로워 presence 소켓으로 push
+    return: 받은 사람 수
+    """
+    owners = followers(user_id)
+    if not owners:
+        return 0
+    friend_index.set_online(user_id, online, owners)
+
+    layer = get_channel_layer()
+    if layer is not None:
+        async_to_sync(_send_all)(layer, owners, user_id, online)
+    return len(owners)
+
+
+async def _send_all(layer, owners: List[int], user_id: int, online: bool) -> None:
+    message = {
+        "type": "friend.presence",
+        "payload": {"userId": user_id, "online": online},
+    }
+    for owner_id in owners:
+        try:
+            await layer.group_send(presence_group(owner_id), message)
+        except Exception:
+            # push 실패해도 목록 다시 불러오면 맞음
+            pass
@@ -0,0 +1,224 @@
+# app/friends/index.py
+import base64
+import json
+from datetime import datetime, timezone as dt_timezone
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from app.common.presence import LAST_SEEN_KEY, online_user_ids
+from app.common.redis_client import get_redis, get_script
+from app.friends.models import Friend
+from app.users.models import calc_age
+
+# 유저별 친구 목록 인덱스 (GET /api/friends 페이지마다 DB+정렬 반복하지 않게)
+#   friends:index:<uid>  zset friend_id -> 정렬 score (작을수록 앞)
+#   friends:cards:<uid>  hash friend_id -> 응답 item JSON (+ "_built" 표시: 친구 0명도 캐시)
+# score = (복지사 아님)*2*SPAN + (오프라인)*SPAN + (MAX_MS - 친구 맺은 시각 ms)
+#   -> 복지사 먼저, 온라인 먼저, 최신 먼저 (기존 Python 정렬과 같은 순서)
+MAX_TOTAL = 100
+SPAN = 10**13
+MAX_MS = SPAN - 1
+BUILT_FIELD = "_built"
+
+
+def index_key(user_id: int) -> str:
+    return f"friends:index:{user_id}"
+
+
+def cards_key(user_id: int) -> str:
+    return f"friends:cards:{user_id}"
+
+
+def index_ttl_sec() -> int:
+    # sweep_presence가 안 돌 때도 ping이 끊겨 바뀐 online 값은 이 시간 안에 반영됨
+    return int(getattr(settings, "FRIEND_INDEX_TTL_SEC", 60))
+
+
+def _score(welfare: bool, online: bool, created_ms: int) -> int:
+    return (
+        (0 if welfare else 2 * SPAN) + (0 if online else SPAN) + (MAX_MS - created_ms)
+    )
+
+
+def _is_online(score: float) -> bool:
+    return int(score // SPAN) % 2 == 0
+
+
+def _card(f: Friend, now_year: int) -> dict:
+    return dict(user_card(f.friend_user, now_year), createdAt=f.created_at.isoformat())
+
+
+def user_card(u, now_year: int) -> dict:
+    """
+    친구 목록/추천 공용 유저 정보 (u.location은 select_related로 미리 로드)
+    """
+    # region: location.region 우선, 없으면 address fallback
+    loc = getattr(u, "location", None)
+    if loc and getattr(loc, "region", ""):
+        region = loc.region
+    else:
+        region = getattr(u, "address", "") or ""
+
+    return {
+        "userId": u.id,
+        "name": u.name,
+        "age": calc_age(u.birth_date, u.birth_year, now_year),
+        "region": region,
+        "isWelfareWorker": bool(u.is_welfare_worker),
+        "profileImageUrl": u.profile_image_url or "",
+    }
+
+
+def build(user_id: int) -> None:
+    """
+    DB에서 최신순 MAX_TOTAL명 읽어서 인덱스를 통째로 다시 만듦
+    """
+    friends = list(
+        Friend.objects.filter(user_id=user_id)
+        .select_related("friend_user", "friend_user__location")
+        .order_by("-created_at")[:MAX_TOTAL]
+    )
+    online_ids = online_user_ids(f.friend_user_id for f in friends)
+    now_year = timezone.now().year
+
+    scores = {}
+    cards = {BUILT_FIELD: "1"}
+    for f in friends:
+        fid = f.friend_user_id
+        scores[fid] = _score(
+            bool(f.friend_user.is_welfare_worker),
+            fid in online_ids,
+            int(f.created_at.timestamp() * 1000),
+        )
+        cards[fid] = json.dumps(_card(f, now_year), ensure_ascii=False)
+
+    ttl = index_ttl_sec()
+    pipe = get_redis().pipeline()
+    pipe.delete(index_key(user_id), cards_key(user_id))
+    if scores:
+        pipe.zadd(index_key(user_id), scores)
+        pipe.expire(index_key(user_id), ttl)
+    pipe.hset(cards_key(user_id), mapping=cards)
+    pipe.expire(cards_key(user_id), ttl)
+    pipe.execute()
+
+
+def invalidate(user_id: int) -> None:
+    get_redis().delete(index_key(user_id), cards_key(user_id))
+
+
+# KEYS = 이 친구를 목록에 둔 유저들의 index / ARGV[1]=friend_id, ARGV[2]="1" 온라인, ARGV[3]=SPAN
+# 인덱스가 있는 유저만 score의 online 자리만 바꿈 (없으면 다음 조회 때 새로 만듦)
+_SET_ONLINE_LUA = """
+local span = tonumber(ARGV[3])
+for _, key in ipairs(KEYS) do
+  local s = redis.call('ZSCORE', key, ARGV[1])
+  if s then
+    s = tonumber(s)
+    local offline = math.floor(s / span) % 2
+    if ARGV[2] == '1' and offline == 1 then
+      s = s - span
+    elseif ARGV[2] ~= '1' and offline == 0 then
+      s = s + span
+    end
+    redis.call('ZADD', key, 'XX', string.format('%.0f', s), ARGV[1])
+  end
+end
+return #KEYS
+"""
+
+
+def set_online(friend_id: int, online: bool, owners: List[int]) -> None:
+    """
+    friend_id의 presence가 바뀌었을 때 그 사람을 친구로 둔 유저들(owners) 인덱스에 반영
+    owners는 fanout.followers() (역인덱스)
+    """
+    if not owners:
+        return
+    get_script("friends_set_online", _SET_ONLINE_LUA)(
+        keys=[index_key(uid) for uid in owners],
+        args=[friend_id, "1" if online else "0", SPAN],
+    )
+
+
+# --- cursor ----------------------------------------------------------------
+def encode_cursor(score: float, friend_id: int) -> str:
+    raw = f"{int(score)}:{friend_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[int, str]]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        score, member = raw.split(":", 1)
+        return int(score), member
+    except Exception:
+        return None
+
+
+def _page_after(r, user_id: int, cursor: Tuple[int, str], limit: int):
+    # 같은 score면 zset은 member 문자열 순 -> 그 순서로 cursor 뒤부터
+    score, member = cursor
+    rows = r.zrangebyscore(
+        index_key(user_id), score, "+inf", withscores=True, start=0, num=limit + 32
+    )
+    out = []
+    for m, s in rows:
+        if s == score and m <= member:
+            continue
+        out.append((m, s))
+        if len(out) > limit:
+            break
+    return out
+
+
+def page(
+    user_id: int,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[Tuple[int, str]] = None,
+) -> Tuple[List[dict], int, Optional[str], bool]:
+    """
+    return: (items, total, nextCursor, 다음 페이지 있는지)
+    """
+    r = get_redis()
+    if not r.exists(cards_key(user_id)):
+        build(user_id)
+
+    if cursor is not None:
+        rows = _page_after(r, user_id, cursor, limit)
+    else:
+        rows = r.zrange(index_key(user_id), offset, offset + limit, withscores=True)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    members = [m for m, _ in rows] or [BUILT_FIELD]
+    pipe = r.pipeline(transaction=False)
+    pipe.zcard(index_key(user_id))
+    pipe.hmget(cards_key(user_id), members)
+    pipe.zmscore(LAST_SEEN_KEY, members)
+    total, raw_cards, seen = pipe.execute()
+
+    items = []
+    for (m, s), raw, seen_at in zip(rows, raw_cards, seen):
+        if raw is None:
+            # 카드만 먼저 만료된 경우: 이번 페이지는 건너뛰고 다음 조회 때 재빌드
+            invalidate(user_id)
+            continue
+        card = json.loads(raw)
+        # 응답 필드 순서는 예전과 같게 (region 다음 online)
+        item = {k: card[k] for k in ("userId", "name", "age", "region")}
+        item["online"] = _is_online(s)
+        item.update(card)
+        # "N분 전 접속" 표시용 (presence:last_seen, 음수는 소켓이 닫힌 시각)
+        item["lastSeenAt"] = (
+            datetime.fromtimestamp(abs(seen_at), tz=dt_timezone.utc).isoformat()
+            if seen_at is not None
+            else None
+        )
+        items.append(item)
+
+    next_cursor = encode_cursor(rows[-1][1], rows[-1][0]) if has_more else None
+    return items, int(total), next_cursor, has_more
@@ -0,0 +1,39 @@
+# app/friends/management/commands/compute_friend_suggestions.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.friends import recommend
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute 'people you may know' (mutual-friend counts) for every user "
+        "and store the top-K per user in Redis. Run periodically (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=recommend.top_k())
+        parser.add_argument(
+            "--hub-max",
+            type=int,
+            default=recommend.hub_max(),
+            help="친구가 이보다 많은 유저는 함께 아는 친구로 세지 않음",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        adj, added = recommend.load_graph()
+        loaded = time.monotonic()
+        edges = sum(len(v) for v in added.values())
+        self.stdout.write(
+            f"[suggest] graph users={len(adj)} edges={edges}"
+            f" load={loaded - started:.1f}s"
+        )
+
+        rows = recommend.compute(adj, added, options["top_k"], options["hub_max"])
+        n = recommend.store(rows)
+        self.stdout.write(
+            f"[suggest] stored={n} compute+store={time.monotonic() - loaded:.1f}s"
+            f" total={time.monotonic() - started:.1f}s"
+        )
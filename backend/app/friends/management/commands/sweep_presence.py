@@ -0,0 +1,50 @@
+# app/friends/management/commands/sweep_presence.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.common import presence
+from app.friends.fanout import publish_presence
+
+
+class Command(BaseCommand):
+    help = (
+        "Presence sweep: announce users whose ping lapsed as offline to their friends "
+        "and prune old last-seen entries. Run one instance."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval-sec",
+            type=float,
+            default=float(getattr(settings, "PRESENCE_SWEEP_INTERVAL_SEC", 5)),
+        )
+        parser.add_argument("--once", action="store_true", help="한 번만 실행")
+
+    def handle(self, *args, **options):
+        interval = options["interval_sec"]
+
+        while True:
+            started = time.monotonic()
+            try:
+                expired = presence.sweep()
+                for user_id in expired:
+                    try:
+                        publish_presence(user_id, False)
+                    except Exception as e:
+                        self.stderr.write(
+                            f"[presence] publish failed user={user_id}: {e}"
+                        )
+                if expired or options["verbosity"] > 1:
+                    self.stdout.write(
+                        f"[presence] offline={len(expired)}"
+                        f" online={presence.online_count()}"
+                        f" took={(time.monotonic() - started) * 1000:.1f}ms"
+                    )
+            except Exception as e:
+                self.stderr.write(f"[presence] sweep failed: {e}")
+
+            if options["once"]:
+                return
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
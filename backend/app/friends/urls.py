@@ -1,10 +1,21 @@
 # app/friends/urls.py
 from django.urls import path
-from .views import FriendListView, FriendAddView
+from .views import (
+    FriendListView,
+    FriendAddView,
+    FriendImportView,
+    FriendSuggestionView,
+)
 
 urlpatterns = [
     path("", FriendListView.as_view()),  # GET /api/friends
     path("add", FriendAddView.as_view()),  # POST /api/friends/add
     path("/", FriendListView.as_view()),  # GET /api/friends
     path("add/", FriendAddView.as_view()),  # POST /api/friends/add
+    path("import", FriendImportView.as_view()),  # POST /api/friends/import
+    path("import/", FriendImportView.as_view()),  # POST /api/friends/import
+    path("suggestions", FriendSuggestionView.as_view()),  # GET /api/friends/suggestions
+    path(
+        "suggestions/", FriendSuggestionView.as_view()
+    ),  # GET /api/friends/suggestions
 ]
@@ -1,16 +1,13 @@
 # app/friends/views.py
-from datetime import datetime
-from django.utils import timezone
-
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from app.friends import contacts, fanout, recommend
+from app.friends import index as friend_index
 from app.friends.models import Friend
 from app.users.models import User
-from app.common.redis_client import get_redis
 
-MAX_TOTAL = 100
 DEFAULT_LIMIT = 6
 MAX_LIMIT = 6
 
@@ -26,10 +23,6 @@ def fail(code: str, message: str, http_status: int = 400):
     )
 
 
-def presence_key(user_id: int) -> str:
-    return f"presence:user:{user_id}"
-
-
 class FriendAddView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -51,13 +44,50 @@ class FriendAddView(APIView):
             user=request.user,
             friend_user=target,
         )
+        if created:
+            friend_index.invalidate(request.user.id)
+            fanout.add_follower(target.id, request.user.id)
 
         return ok({"added": bool(created)})
 
+
+class FriendImportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    # POST /api/friends/import
+    # body: { "phoneNumbers": ["010-1234-5678", ...], "phoneHashes": ["<sha256 hex>", ...] }
+    # phoneHashes = sha256(숫자만 남긴 번호). 둘 중 하나만 보내도 됨
+    def post(self, request):
+        phones = request.data.get("phoneNumbers") or []
+        hashes = request.data.get("phoneHashes") or []
+        if not isinstance(phones, list) or not isinstance(hashes, list):
+            return fail("VALIDATION_ERROR", "phoneNumbers/phoneHashes must be lists")
+
+        # 중복 제거 전 개수로 제한 (큰 배열은 정규화 전에 거절)
+        if len(phones) + len(hashes) > contacts.max_contacts():
+            return fail(
+                "TOO_MANY_CONTACTS",
+                f"up to {contacts.max_contacts()} contacts per request",
+            )
+        try:
+            phones = contacts.clean_phones(phones)
+            hashes = contacts.clean_hashes(hashes)
+        except ValueError as e:
+            return fail(str(e), "phoneNumbers/phoneHashes contain an invalid entry")
+        if not phones and not hashes:
+            return fail("VALIDATION_ERROR", "phoneNumbers or phoneHashes is required")
+        if not contacts.allow_import(request.user.id, len(phones) + len(hashes)):
+            return fail("RATE_LIMITED", "too many contacts imported, try later", 429)
+
+        return ok(contacts.import_contacts(request.user.id, phones, hashes))
+
+
 class FriendListView(APIView):
     permission_classes = [IsAuthenticated]
 
-    # GET /api/friends?offset=0&limit=6
+    # GET /api/friends?limit=6&cursor=<nextCursor>
+    # (예전 클라: ?offset=0&limit=6 도 그대로 지원)
+    # 정렬: 복지사 먼저, 온라인 먼저, 최신 먼저 -> friend_index에 미리 정렬해 둠
     def get(self, request):
         # 0) pagination params
         try:
@@ -77,90 +107,39 @@ class FriendListView(APIView):
         if limit > MAX_LIMIT:
             limit = MAX_LIMIT
 
-        # 1) DB에서 최신순으로 100명까지만 (친구 관계 생성일 기준 최신)
-        qs = (
-            Friend.objects.filter(user=request.user)
-            .select_related("friend_user", "friend_user__location")
-            .order_by("-created_at")[:MAX_TOTAL]
-        )
-        friends = list(qs)
-
-        # 2) Redis 온라인 여부 한 번에 조회
-        r = get_redis()
-        friend_user_ids = [f.friend_user_id for f in friends]
-        keys = [presence_key(uid) for uid in friend_user_ids]
-
-        online_map = {}
-        if keys:
-            vals = r.mget(keys)  # [b"1" or "1" or None, ...]
-            for uid, v in zip(friend_user_ids, vals):
-                online_map[uid] = v is not None
-
-        # 3) 응답 items 구성 (정렬을 위해 created_at datetime 유지)
-        now_year = timezone.now().year
-
-        items = []
-        for f in friends:
-            u = f.friend_user
-
-            # 해커톤용 나이 계산(정책 확정 전): birth_date 있으면 year 기준, 없으면 birth_year
-            age = None
-            if getattr(u, "birth_date", None):
-                age = now_year - u.birth_date.year
-            elif getattr(u, "birth_year", None):
-                age = now_year - int(u.birth_year)
-
-            # region: location.region 우선, 없으면 address fallback
-            region = ""
-            loc = getattr(u, "location", None)
-            if loc and getattr(loc, "region", ""):
-                region = loc.region
-            else:
-                region = getattr(u, "address", "") or ""
-
-            created_dt = f.created_at  # datetime
-
-            items.append(
-                {
-                    "userId": u.id,
-                    "name": u.name,
-                    "age": age,
-                    "region": region,
-                    "online": bool(online_map.get(u.id, False)),
-                    "isWelfareWorker": bool(u.is_welfare_worker),
-                    "profileImageUrl": u.profile_image_url or "",
-                    "_createdAt": created_dt,  # 정렬용 내부 필드
-                }
-            )
+        cursor = None
+        raw_cursor = request.query_params.get("cursor")
+        if raw_cursor:
+            cursor = friend_index.decode_cursor(raw_cursor)
+            if cursor is None:
+                return fail("INVALID_CURSOR", "cursor is invalid")
 
-        # 4) 정렬: 복지사 먼저, 온라인 먼저, 최신 먼저
-        # - welfare: True 먼저  -> not isWelfareWorker (False가 먼저)
-        # - online: True 먼저   -> not online (False가 먼저)
-        # - 최신: createdAt desc -> -timestamp
-        items.sort(
-            key=lambda x: (
-                not x["isWelfareWorker"],
-                not x["online"],
-                -x["_createdAt"].timestamp(),
-            )
+        items, total, next_cursor, has_more = friend_index.page(
+            request.user.id, limit, offset=offset, cursor=cursor
         )
 
-        # 5) 페이지네이션 + createdAt 변환
-        total = len(items)
-        paged = items[offset : offset + limit]
-        next_offset = offset + limit if (offset + limit) < total else None
-
-        # 응답에서는 createdAt만 내보내고 내부필드 제거
-        for it in paged:
-            it["createdAt"] = it["_createdAt"].isoformat()
-            del it["_createdAt"]
-
-        return ok(
-            {
-                "friends": paged,
-                "offset": offset,
-                "limit": limit,
-                "nextOffset": next_offset,
-                "total": total,
-            }
-        )
+        data = {
+            "friends": items,
+            "limit": limit,
+            "nextCursor": next_cursor,
+            "total": total,
+        }
+        if cursor is None:
+            data["offset"] = offset
+            data["nextOffset"] = offset + limit if has_more else None
+        return ok(data)
+
+
+class FriendSuggestionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    # GET /api/friends/suggestions?limit=10
+    # 알 수도 있는 사람 (compute_friend_suggestions가 미리 계산해 둔 것)
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except Exception:
+            limit = 10
+        limit = max(1, min(limit, recommend.top_k()))
+
+        return ok({"suggestions": recommend.suggestions(request.user.id, limit)})
@@ -0,0 +1,225 @@
+# app/matches/batch.py
+import time
+from dataclasses import dataclass, asdict, field
+from typing import List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from app.common.redis_client import get_redis
+from app.matches import queue, shards
+from app.matches.models import MatchSession
+from app.matches.notify import notify_matched
+from app.matches.redis_store import save_session_state
+from app.users.models import User, calc_age
+
+BATCH_STATS_KEY = "match:batch:stats"
+
+# 점수 가중치: 오래 기다릴수록 +, 나이 차이 클수록 -, 같은 지역이면 +
+WAIT_WEIGHT = 1.0  # 초당
+AGE_GAP_WEIGHT = 2.0  # 1살 차이당
+SAME_REGION_BONUS = 15.0
+
+
+@dataclass
+class Candidate:
+    ticket: queue.Ticket
+    age: Optional[int]
+    region: str
+    recent: Set[int] = field(default_factory=set)  # 최근 매칭 상대 (다시 안 붙임)
+
+
+@dataclass
+class RoundStats:
+    pool_size: int = 0
+    planned: int = 0
+    pairs: int = 0
+    elapsed_ms: float = 0.0
+    avg_age_gap: Optional[float] = None
+    same_region_ratio: Optional[float] = None
+    avg_wait_sec: Optional[float] = None
+
+
+def region_key(region: str, address: str) -> str:
+    """
+    "수원시 팔달구" / "서울시 관악구 봉천동" -> 맨 앞 단위("수원시", "서울시")
+    """
+    text = (region or address or "").strip()
+    return text.split()[0] if text else ""
+
+
+def load_candidates(tickets: List[queue.Ticket]) -> List[Candidate]:
+    rows = User.objects.filter(id__in=[t.user_id for t in tickets]).values(
+        "id", "birth_date", "birth_year", "address", "location__region"
+    )
+    now_year = timezone.now().year
+    by_id = {row["id"]: row for row in rows}
+    recent = queue.recent_partners([t.user_id for t in tickets])
+
+    out = []
+    for t in tickets:
+        row = by_id.get(t.user_id)
+        if not row:
+            continue
+        out.append(
+            Candidate(
+                ticket=t,
+                age=calc_age(row["birth_date"], row["birth_year"], now_year),
+                region=region_key(row["location__region"], row["address"]),
+                recent=recent.get(t.user_id, set()),
+            )
+        )
+    return out
+
+
+def pair_score(a: Candidate, b: Candidate, now: float) -> float:
+    score = WAIT_WEIGHT * (
+        (now - a.ticket.waited_since) + (now - b.ticket.waited_since)
+    )
+    if a.age is not None and b.age is not None:
+        score -= AGE_GAP_WEIGHT * abs(a.age - b.age)
+    if a.region and a.region == b.region:
+        score += SAME_REGION_BONUS
+    return score
+
+
+def plan_pairs(cands: List[Candidate], now: float) -> List[Tuple[Candidate, Candidate]]:
+    """
+    전체 쌍 점수를 계산해 높은 점수부터 greedy로 짝짓기 (O(n^2 log n), pool 크기는 제한)
+    각 쌍은 (더 오래 기다린 쪽, 나중에 온 쪽) 순서. 최근 매칭 상대끼리는 후보에서 제외
+    """
+    scored = []
+    for i in range(len(cands)):
+        for j in range(i + 1, len(cands)):
+            if cands[j].ticket.user_id in cands[i].recent:
+                continue
+            scored.append((pair_score(cands[i], cands[j], now), i, j))
+    scored.sort(reverse=True)
+
+    used = set()
+    pairs = []
+    for _, i, j in scored:
+        if i in used or j in used:
+            continue
+        used.add(i)
+        used.add(j)
+        a, b = cands[i], cands[j]
+        if b.ticket.waited_since < a.ticket.waited_since:
+            a, b = b, a
+        pairs.append((a, b))
+    return pairs
+
+
+def _shard_snapshot(shard: str, max_pool: int, now: float) -> List[queue.Ticket]:
+    """
+    내 shard 대기자 + 이웃 shard에서 spill 초 넘게 기다린 대기자
+    (이웃 워커와 같은 사람을 노려도 claim_shard_pairs가 티켓을 확인하므로 한쪽만 성공)
+    """
+    tickets = queue.snapshot(shard=shard, limit=max_pool)
+    cutoff = now - shards.spill_sec()
+    for n in shards.neighbors(shard):
+        room = max_pool - len(tickets)
+        if room <= 0:
+            break
+        tickets += queue.snapshot(shard=n, limit=room, max_score=cutoff)
+
+    seen = set()
+    out = []
+    for t in tickets:
+        if t.user_id not in seen:
+            seen.add(t.user_id)
+            out.append(t)
+    return out
+
+
+def _requeue(t: queue.Ticket, pools: Tuple[str, ...]) -> None:
+    if t.shard:
+        queue.shard_requeue(t.shard, t.user_id, t.session_id, t.waited_since)
+    else:
+        queue.requeue(t.user_id, t.session_id, t.waited_since, pools)
+
+
+def round_shards() -> List[Optional[str]]:
+    """
+    --shard 없이 돌 때 한 라운드에 훑을 대기열 (MATCH_SHARDING이면 shard 전부)
+    """
+    return shards.all_shards() if shards.sharding_enabled() else [None]
+
+
+def run_round(max_pool: int = 300, shard: Optional[str] = None) -> RoundStats:
+    started = time.perf_counter()
+    now = time.time()
+    stats = RoundStats()
+
+    if shard:
+        tickets = _shard_snapshot(shard, max_pool, now)
+    else:
+        tickets = queue.snapshot(limit=max_pool)
+    stats.pool_size = len(tickets)
+    if len(tickets) < 2:
+        stats.elapsed_ms = (time.perf_counter() - started) * 1000
+        return stats
+
+    cands = load_candidates(tickets)
+    planned = plan_pairs(cands, now)
+    stats.planned = len(planned)
+
+    by_ticket = {(a.ticket.user_id, b.ticket.user_id): (a, b) for a, b in planned}
+    pairs = [(a.ticket, b.ticket) for a, b in planned]
+    if shard:
+        claimed = [(a, b, (), ()) for a, b in queue.claim_shard_pairs(pairs)]
+    else:
+        claimed = queue.claim_pairs(pairs)
+
+    # 세션 id는 더 오래 기다린 쪽(a)의 티켓 -> a는 이미 그 id로 시그널링 대기 중
+    sessions = [
+        MatchSession(
+            session_id=a.session_id,
+            user_a_id=a.user_id,
+            user_b_id=b.user_id,
+            status="MATCHED",
+        )
+        for a, b, _, _ in claimed
+    ]
+    try:
+        with transaction.atomic():
+            MatchSession.objects.bulk_create(sessions)
+    except Exception:
+        for a, b, pools_a, pools_b in claimed:
+            _requeue(a, pools_a)
+            _requeue(b, pools_b)
+        raise
+
+    for session in sessions:
+        save_session_state(session, status=session.status)
+        notify_matched(session)
+
+    stats.pairs = len(claimed)
+    if claimed:
+        matched = [by_ticket[(a.user_id, b.user_id)] for a, b, _, _ in claimed]
+        gaps = [
+            abs(a.age - b.age)
+            for a, b in matched
+            if a.age is not None and b.age is not None
+        ]
+        stats.avg_age_gap = round(sum(gaps) / len(gaps), 2) if gaps else None
+        stats.same_region_ratio = round(
+            sum(1 for a, b in matched if a.region and a.region == b.region)
+            / len(matched),
+            3,
+        )
+        stats.avg_wait_sec = round(
+            sum(now - c.ticket.waited_since for pair in matched for c in pair)
+            / (2 * len(matched)),
+            2,
+        )
+
+    stats.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    _save_stats(stats)
+    return stats
+
+
+def _save_stats(stats: RoundStats) -> None:
+    data = {k: ("" if v is None else v) for k, v in asdict(stats).items()}
+    data["at"] = time.time()
+    get_redis().hset(BATCH_STATS_KEY, mapping=data)
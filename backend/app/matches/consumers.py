@@ -1,21 +1,33 @@
 # app/matches/consumers.py
+import asyncio
 import json
 import hashlib
 from urllib.parse import parse_qs
 
+from channels.exceptions import ChannelFull
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
-from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import UntypedToken
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-
-from app.common.redis_client import get_redis
+from django.conf import settings
+
+try:
+    import msgpack
+except ImportError:  # channels_redis 없이 in-memory 레이어만 쓸 때
+    msgpack = None
+
+from app.common import metrics
+from app.config.jwt_auth_middleware import scope_user
+from app.matches import ice, members, queue, ratelimit
+from app.matches.models import MatchSession
+from app.matches.notify import lobby_group
+from app.matches.services import match_shard
 from asgiref.sync import sync_to_async
 
-PEERCOUNT_TTL_SEC = 60 * 30  # 30분
+# 느린 수신자: 서버 -> 클라 대기열이 넘치면 끊음 (워커 메모리가 끝없이 늘지 않게)
+SLOW_CONSUMER_CLOSE_CODE = 4408
+SIGNALING_MESSAGE_TYPES = ("join", "leave", "offer", "answer", "ice")
 
 
-def _peercount_key(session_id: str) -> str:
-    return f"ws:peerCount:{session_id}"
+def _outbound_max() -> int:
+    return int(getattr(settings, "SIGNALING_OUTBOUND_QUEUE", 256))
 
 
 def _make_ephemeral_user_id(channel_name: str) -> int:
@@ -23,40 +35,114 @@ def _make_ephemeral_user_id(channel_name: str) -> int:
     return int(h[:8], 16)  # 32bit 정수
 
 
-def _extract_token_from_scope(scope) -> str:
-    """
-    ws://<host>/ws/signaling/<sessionId>/?token=<ACCESS_TOKEN>
-    """
-    raw_qs = scope.get("query_string", b"")
+def _parse_user_id(value):
     try:
-        qs = raw_qs.decode("utf-8")
-    except Exception:
-        qs = ""
-    params = parse_qs(qs)
-    token_list = params.get("token") or []
-    return token_list[0] if token_list else ""
-
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
 
-@sync_to_async
-def _get_user_by_id(user_id: int):
-    User = get_user_model()
-    return User.objects.filter(id=user_id, is_active=True).first()
 
+MSGPACK_SUBPROTOCOL = "msgpack"
 
-async def _get_user_from_jwt_async(token: str):
-    if not token:
-        return None
 
+def _query_param(scope, name: str) -> str:
     try:
-        UntypedToken(token)
-        payload = UntypedToken(token).payload
-        user_id = payload.get("user_id")
-        if not user_id:
-            return None
+        qs = parse_qs(scope.get("query_string", b"").decode("utf-8"))
     except Exception:
+        return ""
+    return (qs.get(name) or [""])[0]
+
+
+def _query_flag(scope, name: str) -> bool:
+    return _query_param(scope, name) in ("1", "true")
+
+
+def _wants_msgpack(scope) -> bool:
+    if msgpack is None:
+        return False
+    if _query_param(scope, "encoding") == "msgpack":
+        return True
+    return MSGPACK_SUBPROTOCOL in (scope.get("subprotocols") or [])
+
+
+@sync_to_async
+def _get_pending_match(user):
+    """
+    로비 접속 전에 이미 짝이 정해졌으면 (sessionId, peerUserId)
+    """
+    user_id = user.id
+    sid = queue.peek_result(user_id, match_shard(user))
+    if not sid:
+        return None
+    session = (
+        MatchSession.objects.filter(session_id=sid, status="MATCHED")
+        .values("session_id", "user_a_id", "user_b_id")
+        .first()
+    )
+    if not session:
         return None
+    peer_id = (
+        session["user_b_id"]
+        if session["user_a_id"] == user_id
+        else session["user_a_id"]
+    )
+    return str(session["session_id"]), peer_id
 
-    return await _get_user_by_id(user_id)
+
+class MatchLobbyConsumer(AsyncJsonWebsocketConsumer):
+    """
+    매칭 대기 중 결과 push (폴링 대신)
+      - URL: ws://<host>/ws/match/lobby/?token=<ACCESS_TOKEN>
+      - 서버 -> 클라:
+        {
+          "type": "matched",
+          "sessionId": "...",
+          "payload": {"peerUserId": 123}
+        }
+    """
+
+    async def connect(self):
+        user = scope_user(self.scope)
+        if not user:
+            await self.close(code=4401)
+            return
+
+        self.user_id = user.id
+        self.group_name = lobby_group(self.user_id)
+
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        # 접속 전에 이미 매칭됐으면 바로 알려줌
+        pending = await _get_pending_match(user)
+        if pending:
+            session_id, peer_id = pending
+            await self.send_json(
+                {
+                    "type": "matched",
+                    "sessionId": session_id,
+                    "payload": {"peerUserId": peer_id},
+                }
+            )
+
+    async def disconnect(self, close_code):
+        group = getattr(self, "group_name", None)
+        if group:
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # 서버 -> 클라 단방향. keepalive용 ping만 응답
+        if isinstance(content, dict) and content.get("type") == "ping":
+            await self.send_json({"type": "pong"})
+
+    async def match_matched(self, event):
+        await self.send_json(
+            {
+                "type": "matched",
+                "sessionId": event.get("sessionId"),
+                "payload": event.get("payload") or {},
+            }
+        )
 
 
 class SignalingConsumer(AsyncJsonWebsocketConsumer):
@@ -70,15 +156,37 @@ class SignalingConsumer(AsyncJsonWebsocketConsumer):
           "fromUserId": 123,
           "payload": {...}
         }
+      - offer/answer/ice는 보낸 사람을 뺀 참가자에게만 전달 (에코 없음)
+        "toUserId"를 넣으면 그 유저에게만 (다자간 방)
+      - SIGNALING_ICE_COALESCE_MS > 0이면 ice를 잠깐 모아서 한 번에 중계
+        ?iceBatch=1로 접속한 클라는 {"type": "ice-batch", "payload": {"candidates": [...]}}
+        로 받고, 아니면 서버가 다시 ice 하나씩으로 풀어서 보냄
+      - 바이너리 모드: ?encoding=msgpack 또는 subprotocol "msgpack"
+        같은 Envelope를 MessagePack 바이너리 프레임으로 주고받음 (기본은 JSON 텍스트)
+      - 메시지 한도: connection별/session별 token bucket, 넘으면 close 4429
+        (ice를 모아 보낼 때는 session bucket을 flush한 배치 단위로 차감)
+        상대에게서 오는 메시지는 크기 제한된 대기열을 거쳐 전송, 넘치면 close 4408
     """
 
     async def connect(self):
         self.session_id = self.scope["url_route"]["kwargs"]["session_id"]
         self.room_group_name = f"session_{self.session_id}"
+        self.peers = {}  # 상대 channel_name -> user_id
+        self._left = False
+        self._closing = False  # 한도/대기열 초과로 닫는 중 -> 이후 입출력은 버림
+        self._heartbeat = None
+        self._writer = None
+        self._outbox = asyncio.Queue(maxsize=_outbound_max())
+        self._bucket = ratelimit.connection_bucket()
+        self.ice_batch_ok = _query_flag(self.scope, "iceBatch")
+        self._ice = None
+        if ice.coalesce_ms() > 0:
+            self._ice = ice.IceCoalescer(
+                self._send_ice_batch, ice.coalesce_ms(), ice.batch_max()
+            )
 
-        #  0) 쿼리스트링 token 인증 (accept 전에!)
-        token = _extract_token_from_scope(self.scope)
-        user = await _get_user_from_jwt_async(token)
+        #  0) 쿼리스트링 token 인증 (JwtAuthMiddleware에서 검증, accept 전에 확인!)
+        user = scope_user(self.scope)
 
         if not user:
             # 4401/4403 같은 커스텀 close code 사용 가능
@@ -88,10 +196,22 @@ class SignalingConsumer(AsyncJsonWebsocketConsumer):
         self.user = user
         self.user_id = user.id  # ✅ fromUserId = 실제 userId
 
+        self.binary = _wants_msgpack(self.scope)
+        offered = self.scope.get("subprotocols") or []
+        subprotocol = None
+        if self.binary and MSGPACK_SUBPROTOCOL in offered:
+            subprotocol = MSGPACK_SUBPROTOCOL
+
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
-        await self.accept()
+        await self.accept(subprotocol=subprotocol)
 
-        peer_count = await self._peercount_incr()
+        # peerCount + 이미 들어와 있는 사람들 channel (이후 입장/퇴장은 peer.joined/left로 갱신)
+        peer_count, self.peers = await members.join(
+            self.session_id, self.channel_name, self.user_id
+        )
+        self.peers.pop(self.channel_name, None)
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        self._writer = asyncio.create_task(self._drain_outbox())
 
         # 나에게 joined
         await self.send_json(
@@ -110,6 +230,7 @@ class SignalingConsumer(AsyncJsonWebsocketConsumer):
                 "type": "peer.joined",
                 "sessionId": self.session_id,
                 "fromUserId": self.user_id,
+                "channelName": self.channel_name,
                 "payload": {"peerCount": peer_count},
             },
         )
@@ -121,30 +242,99 @@ class SignalingConsumer(AsyncJsonWebsocketConsumer):
         if not room or not session_id or not user_id:
             return
 
-        peer_count = await self._peercount_decr()
+        await self._leave_room()
+
+    async def _leave_room(self):
+        """
+        leave 메시지와 disconnect가 둘 다 와도 한 번만 나감
+        """
+        if self._left:
+            return
+        self._left = True
+        for task in (self._heartbeat, self._writer):
+            if task:
+                task.cancel()
+        if self._ice:
+            await self._ice.flush()
+
+        peer_count = await members.leave(self.session_id, self.channel_name)
 
         await self.channel_layer.group_send(
-            room,
+            self.room_group_name,
             {
                 "type": "peer.left",
-                "sessionId": session_id,
-                "fromUserId": user_id,
+                "sessionId": self.session_id,
+                "fromUserId": self.user_id,
+                "channelName": self.channel_name,
                 "payload": {"peerCount": peer_count},
             },
         )
 
-        await self.channel_layer.group_discard(room, self.channel_name)
+        await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+
+    async def _heartbeat_loop(self):
+        # 살아 있다는 표시. 워커가 죽으면 멈추고 -> stale 초 뒤 멤버에서 빠짐
+        while True:
+            await asyncio.sleep(members.heartbeat_sec())
+            try:
+                await members.heartbeat(
+                    self.session_id, self.channel_name, self.user_id
+                )
+            except Exception:
+                pass
+
+    async def send_json(self, content, close=False):
+        if getattr(self, "binary", False):
+            await self.send(bytes_data=msgpack.packb(content), close=close)
+            return
+        await super().send_json(content, close=close)
 
     async def receive(self, text_data=None, bytes_data=None):
-        if not text_data:
+        if self._closing:
             return
-
         try:
-            data = json.loads(text_data)
+            if text_data:
+                data = json.loads(text_data)
+            elif bytes_data and msgpack is not None:
+                data = msgpack.unpackb(bytes_data)
+            else:
+                return
         except Exception:
             return
+        if not isinstance(data, dict):
+            return
 
         msg_type = data.get("type")
+        # label 개수 고정 (클라이언트가 보낸 임의 type을 그대로 쓰지 않음)
+        label = msg_type if msg_type in SIGNALING_MESSAGE_TYPES else "other"
+        with metrics.SIGNALING_LATENCY.time(label):
+            await self._handle(data, msg_type)
+
+    async def _rate_limited(self):
+        # 첫 초과에서 한 번만 알리고 닫음
+        if self._closing:
+            return
+        self._closing = True
+        await self.send_json(
+            {
+                "type": "error",
+                "sessionId": self.session_id,
+                "payload": {"code": "RATE_LIMITED"},
+            }
+        )
+        metrics.SIGNALING_CLOSED.inc(ratelimit.RATE_LIMIT_CLOSE_CODE)
+        await self.close(code=ratelimit.RATE_LIMIT_CLOSE_CODE)
+
+    async def _handle(self, data: dict, msg_type):
+        # 모아 보내는 ice는 _send_ice_batch에서 배치 단위로 session bucket 차감
+        charge_now = msg_type in ("offer", "answer") or (
+            msg_type == "ice" and not self._ice
+        )
+        if not self._bucket.allow() or (
+            charge_now and not await ratelimit.session_allow(self.session_id)
+        ):
+            await self._rate_limited()
+            return
 
         # join: connect에서 이미 처리했으니 ack만
         if msg_type == "join":
@@ -153,49 +343,115 @@ class SignalingConsumer(AsyncJsonWebsocketConsumer):
                     "type": "joined",
                     "sessionId": self.session_id,
                     "fromUserId": self.user_id,
-                    "payload": {"peerCount": await self._peercount_get()},
+                    "payload": {"peerCount": await members.count(self.session_id)},
                 }
             )
             return
 
         # leave: 정상 종료 이벤트
         if msg_type == "leave":
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "peer.left",
-                    "sessionId": self.session_id,
-                    "fromUserId": self.user_id,
-                    "payload": {"peerCount": max(0, (await self._peercount_get()) - 1)},
-                },
-            )
+            await self._leave_room()
             await self.close(code=1000)
             return
 
         # offer/answer/ice만 중계 (Envelope 강제 통일)
         if msg_type in ("offer", "answer", "ice"):
             payload = data.get("payload") or {}
+            to_user_id = _parse_user_id(data.get("toUserId"))
+            if self._ice:
+                if msg_type == "ice":
+                    await self._ice.add(payload, to_user_id)
+                    return
+                # 모아둔 ice가 offer/answer보다 늦게 도착하지 않게
+                await self._ice.flush()
+
+            envelope = {
+                "type": msg_type,
+                "sessionId": self.session_id,
+                "fromUserId": self.user_id,
+                "payload": payload,
+            }
+            if to_user_id is not None:
+                envelope["toUserId"] = to_user_id
+            await self._send_to_peers(envelope, to_user_id)
 
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "signal.message",
-                    "envelope": {
-                        "type": msg_type,
-                        "sessionId": self.session_id,
-                        "fromUserId": self.user_id,
-                        "payload": payload,
-                    },
-                },
-            )
+    async def _send_ice_batch(self, candidates, to_user_id=None):
+        if self._closing:
+            return
+        if not self._left and not await ratelimit.session_allow(
+            self.session_id, cost=len(candidates)
+        ):
+            await self._rate_limited()
+            return
+        envelope = {
+            "type": "ice-batch",
+            "sessionId": self.session_id,
+            "fromUserId": self.user_id,
+            "payload": {"candidates": candidates},
+        }
+        if to_user_id is not None:
+            envelope["toUserId"] = to_user_id
+        await self._send_to_peers(envelope, to_user_id)
+
+    async def _send_to_peers(self, envelope: dict, to_user_id=None):
+        targets = self._targets(to_user_id)
+        if not targets:
+            # peer.joined보다 먼저 온 신호일 수 있음 -> 레지스트리 다시 읽기
+            self.peers = await members.peers(self.session_id)
+            self.peers.pop(self.channel_name, None)
+            targets = self._targets(to_user_id)
+        for channel in targets:
+            try:
+                await self.channel_layer.send(
+                    channel, {"type": "signal.message", "envelope": envelope}
+                )
+            except ChannelFull:
+                # 상대 channel 대기열이 꽉 참 (상대가 못 따라오는 중) -> 이번 메시지는 버림
+                pass
+
+    def _targets(self, to_user_id=None):
+        return [
+            ch
+            for ch, uid in self.peers.items()
+            if to_user_id is None or uid == to_user_id
+        ]
 
     async def signal_message(self, event):
-        await self.send_json(event.get("envelope") or {})
+        envelope = event.get("envelope") or {}
+        if envelope.get("type") == "ice-batch" and not self.ice_batch_ok:
+            # ice-batch를 모르는 클라: 예전처럼 ice 하나씩
+            batch = envelope.get("payload") or {}
+            for candidate in batch.get("candidates") or []:
+                await self._push(dict(envelope, type="ice", payload=candidate))
+            return
+        await self._push(envelope)
+
+    async def _push(self, message: dict):
+        """
+        상대에게서 온 메시지는 대기열로. 꽉 차면 이 클라가 못 따라오는 것 -> 끊음
+        """
+        if self._left or self._closing:
+            return
+        try:
+            self._outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            # 한 번만 닫음 (이후 push는 위에서 버림)
+            self._closing = True
+            metrics.SIGNALING_CLOSED.inc(SLOW_CONSUMER_CLOSE_CODE)
+            await self.close(code=SLOW_CONSUMER_CLOSE_CODE)
+
+    async def _drain_outbox(self):
+        while True:
+            message = await self._outbox.get()
+            await self.send_json(message)
 
     async def peer_joined(self, event):
+        channel = event.get("channelName")
+        if channel and channel != self.channel_name:
+            self.peers[channel] = event.get("fromUserId")
         if event.get("fromUserId") == self.user_id:
             return
-        await self.send_json(
+        await self._push(
             {
                 "type": "peer-joined",
                 "sessionId": event.get("sessionId"),
@@ -205,9 +461,10 @@ class SignalingConsumer(AsyncJsonWebsocketConsumer):
         )
 
     async def peer_left(self, event):
+        self.peers.pop(event.get("channelName"), None)
         if event.get("fromUserId") == self.user_id:
             return
-        await self.send_json(
+        await self._push(
             {
                 "type": "peer-left",
                 "sessionId": event.get("sessionId"),
@@ -215,28 +472,3 @@ class SignalingConsumer(AsyncJsonWebsocketConsumer):
                 "payload": event.get("payload") or {},
             }
         )
-
-    async def _peercount_get(self) -> int:
-        r = get_redis()
-        raw = r.get(_peercount_key(self.session_id))
-        try:
-            return int(raw) if raw is not None else 0
-        except Exception:
-            return 0
-
-    async def _peercount_incr(self) -> int:
-        r = get_redis()
-        key = _peercount_key(self.session_id)
-        val = r.incr(key)
-        r.expire(key, PEERCOUNT_TTL_SEC)
-        return int(val)
-
-    async def _peercount_decr(self) -> int:
-        r = get_redis()
-        key = _peercount_key(self.session_id)
-        val = r.decr(key)
-        if val <= 0:
-            r.delete(key)
-            return 0
-        r.expire(key, PEERCOUNT_TTL_SEC)
-        return int(val)
@@ -0,0 +1,88 @@
+# app/matches/ice.py
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from app.common import metrics
+
+# trickle ICE 후보를 몇 ms 모아서 "ice-batch" 하나로 보냄 (채널 레이어 publish 횟수 감소)
+# 배치 크기 분포 버킷 (상한, label)
+SIZE_BUCKETS = ((1, "1"), (4, "2-4"), (16, "5-16"))
+SIZE_OVERFLOW = "17+"
+
+
+def coalesce_ms() -> int:
+    # 0이면 끔 (ice를 받는 즉시 하나씩 전달)
+    return int(getattr(settings, "SIGNALING_ICE_COALESCE_MS", 0))
+
+
+def batch_max() -> int:
+    return int(getattr(settings, "SIGNALING_ICE_BATCH_MAX", 32))
+
+
+def _size_label(n: int) -> str:
+    for limit, name in SIZE_BUCKETS:
+        if n <= limit:
+            return name
+    return SIZE_OVERFLOW
+
+
+def record_batch(size: int, delay_ms: float) -> None:
+    """
+    배치 크기/추가 지연 누적 (프로세스 안 카운터, 평균 = delay 합 / batches)
+    flush마다 Redis 왕복을 더하지 않게 워커별로 모으고 Prometheus에서 합침
+    """
+    metrics.SIGNALING_ICE_BATCHES.inc()
+    metrics.SIGNALING_ICE_CANDIDATES.inc(amount=size)
+    metrics.SIGNALING_ICE_BATCH_SIZE.inc(_size_label(size))
+    metrics.SIGNALING_ICE_DELAY.inc(amount=delay_ms / 1000)
+
+
+Flush = Callable[[List[dict], Optional[int]], Awaitable[None]]
+
+
+class IceCoalescer:
+    """
+    toUserId별로 ice payload를 모았다가 window가 지나거나 max개가 차면 flush(payloads, toUserId)
+    """
+
+    def __init__(self, flush: Flush, window_ms: int, max_size: int):
+        self._flush = flush
+        self._window = window_ms / 1000
+        self._max = max_size
+        # toUserId -> (첫 후보가 들어온 시각, payload 목록)
+        self._buf: Dict[Optional[int], Tuple[float, List[dict]]] = {}
+        self._timer: Optional[asyncio.Task] = None
+
+    async def add(self, payload: dict, to_user_id: Optional[int] = None) -> None:
+        started, items = self._buf.setdefault(to_user_id, (time.perf_counter(), []))
+        items.append(payload)
+        if len(items) >= self._max:
+            await self._flush_one(to_user_id)
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._window)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """
+        남은 후보 전부 전송 (offer/answer 보내기 전, 연결 종료 전에도 호출 -> 순서 유지)
+        """
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        for to_user_id in list(self._buf):
+            await self._flush_one(to_user_id)
+
+    async def _flush_one(self, to_user_id: Optional[int]) -> None:
+        entry = self._buf.pop(to_user_id, None)
+        if not entry:
+            return
+        started, items = entry
+        await self._flush(items, to_user_id)
+        record_batch(len(items), (time.perf_counter() - started) * 1000)
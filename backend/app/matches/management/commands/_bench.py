@@ -0,0 +1,47 @@
+# app/matches/management/commands/_bench.py
+# bench_* 커맨드 공용 helper ("_"로 시작해서 커맨드로는 안 잡힘)
+from typing import List, Sequence
+
+from app.users.models import User, hash_phone
+
+BENCH_PHONE_PREFIX = "098"
+
+
+def ensure_bench_users(n: int) -> List[User]:
+    """
+    벤치용 유저 n명 (전화번호 098xxxxxxxx). 이미 있으면 재사용
+    """
+    phones = [f"{BENCH_PHONE_PREFIX}{i:08d}" for i in range(n)]
+    User.objects.bulk_create(
+        [
+            User(
+                phone_number=p,
+                # bulk_create는 save()를 안 거치므로 직접 채움
+                phone_hash=hash_phone(p),
+                name=f"bench{i}",
+                gender="M" if i % 2 else "F",
+                birth_year=1940 + i % 30,
+                address="서울시 관악구" if i % 3 else "수원시 팔달구",
+            )
+            for i, p in enumerate(phones)
+        ],
+        ignore_conflicts=True,
+    )
+    users = list(User.objects.filter(phone_number__in=phones).order_by("phone_number"))
+    for u in users:
+        if not u.is_active:
+            u.is_active = True
+            u.save(update_fields=["is_active"])
+    return users
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, int(round(p / 100 * (len(s) - 1)))))
+    return s[k]
+
+
+def fmt_ms(sec: float) -> str:
+    return f"{sec * 1000:.1f}ms"
@@ -0,0 +1,267 @@
+# app/matches/management/commands/bench_matching.py
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection
+from django.db.models import Q
+from django.utils import timezone
+
+from app.common.redis_client import get_redis
+from app.matches import batch, queue
+from app.matches.models import MatchSession
+from app.matches.services import cancel_waiting, match_shard, request_match
+
+from ._bench import ensure_bench_users, fmt_ms, percentile
+
+
+@dataclass
+class BenchStats:
+    call_latency: List[float] = field(default_factory=list)
+    match_latency: List[float] = field(default_factory=list)
+    observed: Dict[int, Set[str]] = field(default_factory=lambda: defaultdict(set))
+    lock_waits: int = 0
+    lock_wait_sec: float = 0.0
+    timeouts: int = 0
+    errors: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _is_lock_error(e: Exception) -> bool:
+    msg = str(e).lower()
+    return "locked" in msg or "deadlock" in msg or "could not obtain lock" in msg
+
+
+def _timed_request(user, stats: BenchStats):
+    """
+    request_match 1회. 락 에러(SQLite database is locked 등)는 재시도하며 대기 시간 집계
+    """
+    while True:
+        started = time.perf_counter()
+        try:
+            session = request_match(user)
+        except OperationalError as e:
+            if not _is_lock_error(e):
+                raise
+            waited = time.perf_counter() - started
+            with stats.lock:
+                stats.lock_waits += 1
+                stats.lock_wait_sec += waited
+            time.sleep(0.005)
+            continue
+        with stats.lock:
+            stats.call_latency.append(time.perf_counter() - started)
+        return session
+
+
+class Command(BaseCommand):
+    help = "Concurrent matchmaking load benchmark against request_match"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--rounds", type=int, default=3, help="유저당 매칭 횟수")
+        parser.add_argument(
+            "--mode", choices=["threads", "asyncio", "both"], default="both"
+        )
+        parser.add_argument("--poll-ms", type=int, default=50)
+        parser.add_argument("--timeout-sec", type=float, default=20.0)
+        parser.add_argument(
+            "--keep", action="store_true", help="벤치 세션 row를 지우지 않음"
+        )
+
+    def handle(self, *args, **options):
+        users = ensure_bench_users(options["users"])
+        self.stdout.write(
+            f"engine={connection.vendor} users={len(users)} rounds={options['rounds']}"
+            f" matchMode={getattr(settings, 'MATCH_MODE', 'random')}"
+        )
+
+        modes = (
+            ["threads", "asyncio"] if options["mode"] == "both" else [options["mode"]]
+        )
+        for mode in modes:
+            self._reset(users)
+            stats = self._run(mode, users, options)
+            self._report(mode, users, stats)
+            if not options["keep"]:
+                self._reset(users)
+
+    # ------------------------------------------------------------------
+    def _run(self, mode: str, users, options) -> BenchStats:
+        stats = BenchStats()
+        stop = threading.Event()
+        helpers = [threading.Thread(target=self._watch_locks, args=(stop, stats))]
+        if getattr(settings, "MATCH_MODE", "random") == "batch":
+            helpers.append(threading.Thread(target=self._batch_matcher, args=(stop,)))
+        for t in helpers:
+            t.start()
+
+        self._started_at = timezone.now()
+        started = time.perf_counter()
+        try:
+            if mode == "threads":
+                with ThreadPoolExecutor(max_workers=len(users)) as ex:
+                    list(ex.map(lambda u: self._user_loop(u, stats, options), users))
+            else:
+                asyncio.run(self._async_main(users, stats, options))
+        finally:
+            stop.set()
+            for t in helpers:
+                t.join()
+        self._wall = time.perf_counter() - started
+        return stats
+
+    def _user_loop(self, user, stats: BenchStats, options):
+        poll = options["poll_ms"] / 1000
+        try:
+            for _ in range(options["rounds"]):
+                started = time.perf_counter()
+                deadline = started + options["timeout_sec"]
+                session = _timed_request(user, stats)
+                while session.status != "MATCHED" and time.perf_counter() < deadline:
+                    time.sleep(poll)
+                    session = _timed_request(user, stats)
+                self._record(user, session, started, stats)
+        except Exception:
+            with stats.lock:
+                stats.errors += 1
+        finally:
+            close_old_connections()
+            connection.close()
+
+    async def _async_main(self, users, stats: BenchStats, options):
+        request = sync_to_async(_timed_request, thread_sensitive=False)
+        record = sync_to_async(self._record, thread_sensitive=False)
+        poll = options["poll_ms"] / 1000
+
+        async def one(user):
+            try:
+                for _ in range(options["rounds"]):
+                    started = time.perf_counter()
+                    deadline = started + options["timeout_sec"]
+                    session = await request(user, stats)
+                    while (
+                        session.status != "MATCHED" and time.perf_counter() < deadline
+                    ):
+                        await asyncio.sleep(poll)
+                        session = await request(user, stats)
+                    await record(user, session, started, stats)
+            except Exception:
+                with stats.lock:
+                    stats.errors += 1
+
+        await asyncio.gather(*(one(u) for u in users))
+
+    def _record(self, user, session, started: float, stats: BenchStats):
+        if session.status != "MATCHED":
+            # 시간 초과: 대기열에서 빼고 다음 라운드
+            cancel_waiting(user, session.session_id)
+            with stats.lock:
+                stats.timeouts += 1
+            return
+        with stats.lock:
+            stats.match_latency.append(time.perf_counter() - started)
+            stats.observed[user.id].add(str(session.session_id))
+
+    def _batch_matcher(self, stop: threading.Event):
+        interval = int(getattr(settings, "MATCH_BATCH_INTERVAL_MS", 300)) / 1000
+        try:
+            while not stop.is_set():
+                for shard in batch.round_shards():
+                    batch.run_round(
+                        max_pool=int(getattr(settings, "MATCH_BATCH_MAX_POOL", 300)),
+                        shard=shard,
+                    )
+                stop.wait(interval)
+        finally:
+            connection.close()
+
+    def _watch_locks(self, stop: threading.Event, stats: BenchStats):
+        """
+        Postgres면 pg_locks에서 granted=false인 락 대기를 샘플링
+        """
+        if connection.vendor != "postgresql":
+            return
+        try:
+            with connection.cursor() as cur:
+                while not stop.is_set():
+                    cur.execute("SELECT count(*) FROM pg_locks WHERE NOT granted")
+                    waiting = cur.fetchone()[0]
+                    if waiting:
+                        with stats.lock:
+                            stats.lock_waits += waiting
+                    stop.wait(0.05)
+        finally:
+            connection.close()
+
+    # ------------------------------------------------------------------
+    def _reset(self, users):
+        """
+        벤치 유저의 대기 티켓/결과/최근 상대/세션 정리
+        """
+        r = get_redis()
+        for u in users:
+            shard = match_shard(u)
+            tickets = queue.shard_keys(shard).tickets if shard else queue.TICKETS_KEY
+            sid = r.hget(tickets, str(u.id))
+            if sid:
+                cancel_waiting(u, sid)
+            queue.clear_result(u.id, shard)
+        # 최근 상대 기록도 지워야 다음 실행에서 같은 유저끼리 다시 매칭됨
+        r.delete(*[queue.recent_key(u.id) for u in users])
+        MatchSession.objects.filter(Q(user_a__in=users) | Q(user_b__in=users)).delete()
+
+    def _report(self, mode: str, users, stats: BenchStats):
+        ids = [u.id for u in users]
+        sessions = list(
+            MatchSession.objects.filter(
+                Q(user_a_id__in=ids) | Q(user_b_id__in=ids),
+                started_at__gte=self._started_at,
+            ).values_list("session_id", "user_a_id", "user_b_id")
+        )
+
+        # 이상 징후: 자기 자신과 매칭 / 한 세션을 3명 이상이 받음 / 본인이 모르는 세션
+        seen_by = defaultdict(set)
+        for uid, sids in stats.observed.items():
+            for sid in sids:
+                seen_by[sid].add(uid)
+        self_pairs = sum(1 for _, a, b in sessions if a == b)
+        duplicates = sum(1 for v in seen_by.values() if len(v) > 2)
+        orphaned = sum(
+            1
+            for sid, a, b in sessions
+            for uid in (a, b)
+            if uid and str(sid) not in stats.observed.get(uid, ())
+        )
+
+        p = self.stdout.write
+        p(f"\n== {mode} ({connection.vendor}) ==")
+        p(
+            f"request_match  calls={len(stats.call_latency)}"
+            f" p50={fmt_ms(percentile(stats.call_latency, 50))}"
+            f" p99={fmt_ms(percentile(stats.call_latency, 99))}"
+        )
+        p(
+            f"time-to-match  n={len(stats.match_latency)}"
+            f" p50={fmt_ms(percentile(stats.match_latency, 50))}"
+            f" p99={fmt_ms(percentile(stats.match_latency, 99))}"
+        )
+        p(
+            f"pairs={len(sessions)} wall={self._wall:.2f}s"
+            f" pairs/sec={len(sessions) / self._wall if self._wall else 0:.1f}"
+        )
+        p(
+            f"anomalies: selfPairs={self_pairs} duplicatePairs={duplicates}"
+            f" orphaned={orphaned}"
+        )
+        p(
+            f"lockWaits={stats.lock_waits} lockWaitTime={fmt_ms(stats.lock_wait_sec)}"
+            f" timeouts={stats.timeouts} errors={stats.errors}"
+        )
@@ -0,0 +1,117 @@
+# app/matches/management/commands/bench_peercount.py
+import asyncio
+import time
+from typing import List
+
+from django.core.management.base import BaseCommand
+
+from app.common.redis_client import get_redis
+from app.matches import members
+
+from ._bench import fmt_ms, percentile
+
+TICK_SEC = 0.001
+PEERCOUNT_TTL_SEC = 60 * 30
+
+
+def _peercount_key(session_id: str) -> str:
+    return f"ws:peerCount:{session_id}"
+
+
+# 예전 SignalingConsumer 방식: async def 안에서 동기 클라이언트로 INCR/DECR
+async def _sync_incr(session_id: str, channel: str) -> int:
+    r = get_redis()
+    key = _peercount_key(session_id)
+    val = r.incr(key)
+    r.expire(key, PEERCOUNT_TTL_SEC)
+    return int(val)
+
+
+async def _sync_decr(session_id: str, channel: str) -> int:
+    r = get_redis()
+    key = _peercount_key(session_id)
+    val = r.decr(key)
+    if val <= 0:
+        r.delete(key)
+        return 0
+    r.expire(key, PEERCOUNT_TTL_SEC)
+    return int(val)
+
+
+async def _sync_get(session_id: str) -> int:
+    raw = get_redis().get(_peercount_key(session_id))
+    return int(raw) if raw is not None else 0
+
+
+# 지금 방식: redis.asyncio + Lua로 멤버 zset 갱신
+async def _members_join(session_id: str, channel: str) -> int:
+    count, _ = await members.join(session_id, channel, 0)
+    return count
+
+
+IMPLS = {
+    "sync": (_sync_incr, _sync_get, _sync_decr),
+    "async": (_members_join, members.count, members.leave),
+}
+
+
+async def _watch_loop(stop: asyncio.Event, lags: List[float]):
+    """
+    1ms마다 깨어나기로 한 타이머가 실제로 얼마나 늦게 깨어났는지 = 루프 멈춤 시간
+    """
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_SEC)
+        lags.append(max(0.0, time.perf_counter() - started - TICK_SEC))
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure ASGI event-loop stall caused by signaling peerCount Redis calls "
+        "(legacy sync INCR/DECR vs redis.asyncio membership scripts)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", type=int, default=200)
+        parser.add_argument(
+            "--rounds", type=int, default=20, help="세션당 connect/join/disconnect 반복"
+        )
+        parser.add_argument("--impl", choices=["sync", "async", "both"], default="both")
+
+    def handle(self, *args, **options):
+        impls = ["sync", "async"] if options["impl"] == "both" else [options["impl"]]
+        for impl in impls:
+            lags, ops, wall = asyncio.run(self._run(impl, options))
+            self.stdout.write(
+                f"[{impl}] ops={ops} wall={wall:.2f}s ops/sec={ops / wall:.0f}"
+                f" loopStall p50={fmt_ms(percentile(lags, 50))}"
+                f" p99={fmt_ms(percentile(lags, 99))}"
+                f" max={fmt_ms(max(lags, default=0.0))}"
+                f" total={fmt_ms(sum(lags))}"
+            )
+
+    async def _run(self, impl: str, options):
+        incr, get, decr = IMPLS[impl]
+        sessions = [f"bench-{impl}-{i}" for i in range(options["sessions"])]
+        rounds = options["rounds"]
+
+        async def one(session_id: str):
+            for _ in range(rounds):
+                # 두 명 입장 -> join ack -> 두 명 퇴장
+                await incr(session_id, "a")
+                await incr(session_id, "b")
+                await get(session_id)
+                await decr(session_id, "a")
+                await decr(session_id, "b")
+
+        stop = asyncio.Event()
+        lags: List[float] = []
+        watcher = asyncio.create_task(_watch_loop(stop, lags))
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(one(s) for s in sessions))
+        finally:
+            wall = time.perf_counter() - started
+            stop.set()
+            await watcher
+        return lags, len(sessions) * rounds * 5, wall
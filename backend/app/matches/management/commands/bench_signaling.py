@@ -0,0 +1,176 @@
+# app/matches/management/commands/bench_signaling.py
+import asyncio
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from typing import List
+
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from app.config.routing import application
+
+from ._bench import ensure_bench_users, fmt_ms, percentile
+
+IN_MEMORY_LAYER = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+# 실제 통화와 비슷한 크기: SDP offer/answer 수 KB, ice 후보 100바이트 남짓
+SDP_SIZE = 3000
+ICE_CANDIDATE = "candidate:842163049 1 udp 1677729535 203.0.113.7 46154 typ srflx"
+
+
+@dataclass
+class Stats:
+    connect: List[float] = field(default_factory=list)
+    fanout: List[float] = field(default_factory=list)
+    sent: int = 0
+    received: int = 0
+    errors: int = 0
+
+
+def _signal(kind: str, payload: dict) -> dict:
+    return {"type": kind, "payload": dict(payload, t=time.perf_counter())}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test SignalingConsumer with N two-peer rooms replaying offer/answer/ice "
+        "(in-memory and/or Redis channel layer)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rooms", type=int, default=500)
+        parser.add_argument("--ice", type=int, default=10, help="peer당 ice 후보 수")
+        parser.add_argument(
+            "--layer", choices=["memory", "redis", "both"], default="both"
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=200, help="동시에 진행하는 방 수"
+        )
+        parser.add_argument("--timeout-sec", type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        users = ensure_bench_users(options["rooms"] * 2)
+        tokens = [str(AccessToken.for_user(u)) for u in users]
+        layers = (
+            ["memory", "redis"] if options["layer"] == "both" else [options["layer"]]
+        )
+        for layer in layers:
+            config = IN_MEMORY_LAYER if layer == "memory" else settings.CHANNEL_LAYERS
+            with override_settings(CHANNEL_LAYERS=config):
+                stats, wall, mem = asyncio.run(self._run(users, tokens, options))
+            self._report(layer, options, stats, wall, mem)
+
+    # ------------------------------------------------------------------
+    async def _run(self, users, tokens, options):
+        stats = Stats()
+        timeout = options["timeout_sec"]
+        sem = asyncio.Semaphore(options["concurrency"])
+        rooms = options["rooms"]
+        opened: List[WebsocketCommunicator] = []
+        # 모든 방이 연결된 뒤에 메모리를 재고 트래픽을 흘림
+        all_connected = asyncio.Event()
+        connected = 0
+
+        async def connect(token: str, session_id: str) -> WebsocketCommunicator:
+            started = time.perf_counter()
+            comm = WebsocketCommunicator(
+                application, f"/ws/signaling/{session_id}/?token={token}"
+            )
+            ok, _ = await comm.connect(timeout=timeout)
+            if not ok:
+                raise RuntimeError("connect rejected")
+            await comm.receive_json_from(timeout=timeout)  # joined
+            stats.connect.append(time.perf_counter() - started)
+            opened.append(comm)
+            return comm
+
+        async def expect(comm: WebsocketCommunicator, n: int):
+            # 시그널만 세고 peer-joined/peer-left는 건너뜀
+            while n:
+                msg = await comm.receive_json_from(timeout=timeout)
+                t = (msg.get("payload") or {}).get("t")
+                if t is None:
+                    continue
+                stats.fanout.append(time.perf_counter() - t)
+                stats.received += 1
+                n -= 1
+
+        def mark_connected():
+            nonlocal connected
+            connected += 1
+            if connected == rooms:
+                all_connected.set()
+
+        async def room(i: int):
+            session_id = str(uuid.uuid4())
+            try:
+                async with sem:
+                    try:
+                        a = await connect(tokens[2 * i], session_id)
+                        b = await connect(tokens[2 * i + 1], session_id)
+                    finally:
+                        mark_connected()
+                await all_connected.wait()
+
+                async with sem:
+                    await a.send_json_to(_signal("offer", {"sdp": "o" * SDP_SIZE}))
+                    await expect(b, 1)
+                    await b.send_json_to(_signal("answer", {"sdp": "a" * SDP_SIZE}))
+                    await expect(a, 1)
+                    for k in range(options["ice"]):
+                        await a.send_json_to(
+                            _signal("ice", {"candidate": ICE_CANDIDATE, "k": k})
+                        )
+                        await b.send_json_to(
+                            _signal("ice", {"candidate": ICE_CANDIDATE, "k": k})
+                        )
+                    stats.sent += 2 + 2 * options["ice"]
+                    await asyncio.gather(
+                        expect(a, options["ice"]), expect(b, options["ice"])
+                    )
+            except Exception:
+                stats.errors += 1
+
+        # tracemalloc은 느려서 연결 단계에서만 켬 (fan-out 지연에는 영향 없게)
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(room(i)) for i in range(rooms)]
+        await all_connected.wait()
+        mem = (tracemalloc.get_traced_memory()[0] - base) / max(1, len(opened))
+        tracemalloc.stop()
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - started
+
+        for comm in opened:
+            try:
+                await comm.disconnect()
+            except Exception:
+                pass
+        return stats, wall, mem
+
+    def _report(self, layer: str, options, stats: Stats, wall: float, mem: float):
+        p = self.stdout.write
+        p(f"\n== {layer} layer: rooms={options['rooms']} ice={options['ice']} ==")
+        p(
+            f"connect  n={len(stats.connect)}"
+            f" p50={fmt_ms(percentile(stats.connect, 50))}"
+            f" p99={fmt_ms(percentile(stats.connect, 99))}"
+        )
+        p(
+            f"fan-out  n={len(stats.fanout)}"
+            f" p50={fmt_ms(percentile(stats.fanout, 50))}"
+            f" p95={fmt_ms(percentile(stats.fanout, 95))}"
+            f" p99={fmt_ms(percentile(stats.fanout, 99))}"
+        )
+        p(
+            f"messages sent={stats.sent} received={stats.received}"
+            f" msgs/sec={stats.received / wall if wall else 0:.0f}"
+            f" errors={stats.errors} wall={wall:.2f}s"
+        )
+        p(f"memory/connection={mem / 1024:.1f}KiB (tracemalloc, python heap)")
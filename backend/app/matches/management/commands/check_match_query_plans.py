@@ -0,0 +1,169 @@
+# app/matches/management/commands/check_match_query_plans.py
+import random
+import re
+import uuid
+from datetime import timedelta
+from typing import Dict, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from app.matches.models import MatchSession
+from app.users.models import User, hash_phone
+
+SEED_PHONE_PREFIX = "099"
+CHUNK = 10_000
+
+# 상태 분포: 대부분 끝난 세션, 소수만 대기/진행 중 (실서비스 비율 근사)
+STATUS_WEIGHTS = (
+    ("ENDED", 90),
+    ("CANCELED", 7),
+    ("MATCHED", 2),
+    ("WAITING", 1),
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _full_scan(plan: str) -> bool:
+    table = MatchSession._meta.db_table
+    if connection.vendor == "postgresql":
+        return f"Seq Scan on {table}" in plan
+    # sqlite: "SCAN <table>" 뒤에 USING (COVERING) INDEX가 없으면 풀스캔
+    return re.search(rf"SCAN {table}(?! USING)", plan) is not None
+
+
+def plan_verdict(plan: str, index: str) -> str:
+    """
+    "ok" / "FULL SCAN" / "not using <index>". 풀스캔이 아니어도 다른 인덱스를 타면 실패
+    """
+    if _full_scan(plan):
+        return "FULL SCAN"
+    if index not in plan:
+        return f"not using {index}"
+    return "ok"
+
+
+def seed_sessions(rows: int, n_users: int) -> List[int]:
+    """
+    유저 n_users명 + 세션 rows개를 만들고 통계 갱신. return: 유저 id 목록
+    """
+    phones = [f"{SEED_PHONE_PREFIX}{i:08d}" for i in range(n_users)]
+    User.objects.bulk_create(
+        [
+            User(
+                phone_number=p,
+                # bulk_create는 save()를 안 거치므로 직접 채움
+                phone_hash=hash_phone(p),
+                name=f"plan{i}",
+                gender="M",
+                birth_year=1950,
+                address="",
+            )
+            for i, p in enumerate(phones)
+        ]
+    )
+    user_ids = list(
+        User.objects.filter(phone_number__startswith=SEED_PHONE_PREFIX).values_list(
+            "id", flat=True
+        )
+    )
+
+    statuses = [s for s, w in STATUS_WEIGHTS for _ in range(w)]
+    for start in range(0, rows, CHUNK):
+        batch = []
+        for _ in range(min(CHUNK, rows - start)):
+            a, b = random.sample(user_ids, 2)
+            batch.append(
+                MatchSession(
+                    session_id=uuid.uuid4(),
+                    user_a_id=a,
+                    user_b_id=b,
+                    status=random.choice(statuses),
+                )
+            )
+        MatchSession.objects.bulk_create(batch)
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cur:
+            cur.execute(f"ANALYZE {MatchSession._meta.db_table}")
+    elif connection.vendor == "sqlite":
+        with connection.cursor() as cur:
+            cur.execute("ANALYZE")
+    return user_ids
+
+
+def hot_queries(ua: int, ub: int, cutoff) -> Dict[str, Tuple[QuerySet, str]]:
+    """
+    label -> (쿼리, 써야 하는 인덱스)
+    """
+    return {
+        "waiting by started_at (reaper)": (
+            MatchSession.objects.filter(
+                status="WAITING", started_at__lt=cutoff
+            ).order_by("started_at"),
+            "match_status_started_idx",
+        ),
+        "status + started_at": (
+            MatchSession.objects.filter(status="MATCHED").order_by("started_at"),
+            "match_status_started_idx",
+        ),
+        "user_a + status by -started_at": (
+            MatchSession.objects.filter(user_a_id=ua, status="WAITING").order_by(
+                "-started_at"
+            ),
+            "match_a_status_started_idx",
+        ),
+        "user_a + user_b + status (friend call)": (
+            MatchSession.objects.filter(user_a_id=ua, user_b_id=ub)
+            .exclude(status__in=["ENDED", "CANCELED"])
+            .order_by("-started_at"),
+            "match_a_b_status_idx",
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed MatchSession rows inside a rolled-back transaction and fail "
+        "if hot queries do not use their intended index"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--users", type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        rows, n_users = options["rows"], options["users"]
+
+        try:
+            with transaction.atomic():
+                failures = self._seed_and_check(rows, n_users)
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"bad query plan in: {', '.join(failures)}")
+        self.stdout.write(
+            self.style.SUCCESS("all hot MatchSession queries use their indexes")
+        )
+
+    def _seed_and_check(self, rows: int, n_users: int):
+        now = timezone.now()
+        user_ids = seed_sessions(rows, n_users)
+        self.stdout.write(f"seeded {rows} sessions / {len(user_ids)} users")
+
+        queries = hot_queries(user_ids[0], user_ids[1], now - timedelta(minutes=2))
+        failures = []
+        for label, (qs, index) in queries.items():
+            plan = qs.explain()
+            verdict = plan_verdict(plan, index)
+            self.stdout.write(f"--- {label}: {verdict}\n{plan}")
+            if verdict != "ok":
+                failures.append(f"{label} ({verdict})")
+        return failures
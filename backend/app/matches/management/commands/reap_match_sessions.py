@@ -0,0 +1,35 @@
+# app/matches/management/commands/reap_match_sessions.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.matches.reaper import reap
+
+
+class Command(BaseCommand):
+    help = (
+        "Cancel stale WAITING tickets / MATCHED sessions whose users have no presence"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval-sec", type=float, default=15.0)
+        parser.add_argument("--once", action="store_true", help="한 번만 실행")
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                stats = reap()
+            except Exception as e:
+                self.stderr.write(f"[reaper] sweep failed: {e}")
+            else:
+                if any(vars(stats).values()):
+                    self.stdout.write(
+                        f"[reaper] waiting={stats.waiting_canceled}"
+                        f" sessions={stats.sessions_canceled}"
+                        f" extended={stats.sessions_extended}"
+                        f" legacy={stats.legacy_canceled}"
+                    )
+
+            if options["once"]:
+                return
+            time.sleep(options["interval_sec"])
@@ -0,0 +1,61 @@
+# app/matches/management/commands/run_matcher.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.matches.batch import round_shards, run_round
+
+
+class Command(BaseCommand):
+    help = "Batch matcher: pair WAITING users by score every N ms (MATCH_MODE=batch)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval-ms",
+            type=int,
+            default=int(getattr(settings, "MATCH_BATCH_INTERVAL_MS", 300)),
+        )
+        parser.add_argument(
+            "--max-pool",
+            type=int,
+            default=int(getattr(settings, "MATCH_BATCH_MAX_POOL", 300)),
+        )
+        parser.add_argument(
+            "--shard",
+            default=None,
+            help="이 지역 shard만 담당 (MATCH_SHARDING=1, shard마다 워커 1개)",
+        )
+        parser.add_argument("--once", action="store_true", help="한 라운드만 실행")
+
+    def handle(self, *args, **options):
+        interval = options["interval_ms"] / 1000
+        max_pool = options["max_pool"]
+        # --shard 없이 MATCH_SHARDING이면 워커 하나가 shard를 돌아가며 처리
+        targets = [options["shard"]] if options["shard"] else round_shards()
+
+        while True:
+            started = time.monotonic()
+            for shard in targets:
+                self._round(max_pool, shard)
+
+            if options["once"]:
+                return
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def _round(self, max_pool: int, shard):
+        tag = f"[matcher:{shard}]" if shard else "[matcher]"
+        try:
+            stats = run_round(max_pool=max_pool, shard=shard)
+        except Exception as e:
+            # 워커는 죽지 않고 다음 라운드에서 재시도
+            self.stderr.write(f"{tag} round failed: {e}")
+            return
+        if stats.pool_size:
+            self.stdout.write(
+                f"{tag} pool={stats.pool_size} pairs={stats.pairs}"
+                f"/{stats.planned} {stats.elapsed_ms}ms"
+                f" ageGap={stats.avg_age_gap}"
+                f" sameRegion={stats.same_region_ratio}"
+                f" wait={stats.avg_wait_sec}s"
+            )
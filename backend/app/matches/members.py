@@ -0,0 +1,135 @@
+# app/matches/members.py
+import time
+from typing import Dict, Tuple
+
+from django.conf import settings
+
+from app.common.redis_client import get_async_redis, get_async_script
+
+# 시그널링 방 참가자 (INCR/DECR peerCount 대체)
+#   ws:members:<sid>  zset  channel_name -> 마지막 heartbeat 시각
+#   ws:channels:<sid> hash  channel_name -> user_id (상대에게 직접 send할 때 사용)
+# peerCount = 살아 있는 connection 수. 워커가 죽어서 disconnect가 안 불려도
+# heartbeat가 끊긴 멤버는 다음 join/heartbeat/leave 때 같이 정리됨
+MEMBERS_TTL_SEC = 60 * 30  # 30분 (방 전체 key 만료)
+
+
+def members_key(session_id: str) -> str:
+    return f"ws:members:{session_id}"
+
+
+def channels_key(session_id: str) -> str:
+    return f"ws:channels:{session_id}"
+
+
+def heartbeat_sec() -> float:
+    return float(getattr(settings, "SIGNALING_HEARTBEAT_SEC", 15))
+
+
+def stale_sec() -> float:
+    # heartbeat를 몇 번 놓쳐야 나간 걸로 볼지
+    return float(getattr(settings, "SIGNALING_MEMBER_STALE_SEC", 45))
+
+
+_PRUNE_LUA = """
+local function prune(members, channels, cutoff)
+  local dead = redis.call('ZRANGEBYSCORE', members, '-inf', '(' .. cutoff)
+  if #dead > 0 then
+    redis.call('ZREM', members, unpack(dead))
+    redis.call('HDEL', channels, unpack(dead))
+  end
+end
+"""
+
+# join/heartbeat 공용 (heartbeat가 늦어 정리됐던 connection도 다시 들어옴)
+# KEYS[1]=members, KEYS[2]=channels
+# ARGV[1]=channel, ARGV[2]=user_id, ARGV[3]=now, ARGV[4]=stale 초, ARGV[5]=TTL,
+# ARGV[6]="1"이면 참가자 목록도 반환
+# return: {count, channel1, uid1, channel2, uid2, ...}
+_JOIN_LUA = (
+    _PRUNE_LUA
+    + """
+prune(KEYS[1], KEYS[2], tonumber(ARGV[3]) - tonumber(ARGV[4]))
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+local out = {redis.call('ZCARD', KEYS[1])}
+if ARGV[6] == '1' then
+  for _, v in ipairs(redis.call('HGETALL', KEYS[2])) do
+    table.insert(out, v)
+  end
+end
+return out
+"""
+)
+
+# KEYS[1]=members, KEYS[2]=channels / ARGV[1]=channel, ARGV[2]=now, ARGV[3]=stale 초
+# return: 남은 인원 (0이면 key 삭제)
+_LEAVE_LUA = (
+    _PRUNE_LUA
+    + """
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+prune(KEYS[1], KEYS[2], tonumber(ARGV[2]) - tonumber(ARGV[3]))
+local n = redis.call('ZCARD', KEYS[1])
+if n == 0 then
+  redis.call('DEL', KEYS[1], KEYS[2])
+end
+return n
+"""
+)
+
+
+async def _join(session_id: str, channel: str, user_id: int, with_peers: bool):
+    return await get_async_script("members_join", _JOIN_LUA)(
+        keys=[members_key(session_id), channels_key(session_id)],
+        args=[
+            channel,
+            user_id,
+            time.time(),
+            stale_sec(),
+            MEMBERS_TTL_SEC,
+            "1" if with_peers else "0",
+        ],
+        client=get_async_redis(),
+    )
+
+
+async def join(
+    session_id: str, channel: str, user_id: int
+) -> Tuple[int, Dict[str, int]]:
+    """
+    return: (peerCount, 참가자 channel_name -> user_id)
+    """
+    res = await _join(session_id, channel, user_id, True)
+    flat = res[1:]
+    return int(res[0]), {flat[i]: int(flat[i + 1]) for i in range(0, len(flat), 2)}
+
+
+async def heartbeat(session_id: str, channel: str, user_id: int) -> int:
+    res = await _join(session_id, channel, user_id, False)
+    return int(res[0])
+
+
+async def leave(session_id: str, channel: str) -> int:
+    res = await get_async_script("members_leave", _LEAVE_LUA)(
+        keys=[members_key(session_id), channels_key(session_id)],
+        args=[channel, time.time(), stale_sec()],
+        client=get_async_redis(),
+    )
+    return int(res)
+
+
+async def count(session_id: str) -> int:
+    # 읽기 전용: heartbeat가 살아 있는 connection만
+    return int(
+        await get_async_redis().zcount(
+            members_key(session_id), time.time() - stale_sec(), "+inf"
+        )
+    )
+
+
+async def peers(session_id: str) -> Dict[str, int]:
+    raw = await get_async_redis().hgetall(channels_key(session_id))
+    return {ch: int(uid) for ch, uid in raw.items()}
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.27 on 2026-10-17 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='matchsession',
+            index=models.Index(fields=['status', 'started_at'], name='match_status_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='matchsession',
+            index=models.Index(fields=['user_a', 'status', '-started_at'], name='match_a_status_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='matchsession',
+            index=models.Index(fields=['user_a', 'user_b', 'status'], name='match_a_b_status_idx'),
+        ),
+    ]
@@ -28,3 +28,20 @@ class MatchSession(models.Model):
     started_at = models.DateTimeField(auto_now_add=True)
     ended_at = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="WAITING")
+
+    class Meta:
+        indexes = [
+            # 상태별 조회/정리 (reaper, 관리자 통계)
+            models.Index(
+                fields=["status", "started_at"], name="match_status_started_idx"
+            ),
+            # 내 세션 중 특정 상태 최신순
+            models.Index(
+                fields=["user_a", "status", "-started_at"],
+                name="match_a_status_started_idx",
+            ),
+            # FriendCallStartView: 두 사람 사이 진행 중 세션
+            models.Index(
+                fields=["user_a", "user_b", "status"], name="match_a_b_status_idx"
+            ),
+        ]
@@ -0,0 +1,36 @@
+# app/matches/notify.py
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+
+def lobby_group(user_id: int) -> str:
+    return f"match_user_{user_id}"
+
+
+def notify_matched(session) -> None:
+    """
+    로비 WS(ws/match/lobby/)에 붙어 있는 두 사람에게 matched 이벤트 push.
+    채널 레이어 장애가 매칭 자체를 깨면 안 되니 실패는 무시 (다음 요청 때 결과 key로 받음)
+    """
+    layer = get_channel_layer()
+    if layer is None:
+        return
+
+    pairs = (
+        (session.user_a_id, session.user_b_id),
+        (session.user_b_id, session.user_a_id),
+    )
+    for user_id, peer_id in pairs:
+        if not user_id:
+            continue
+        try:
+            async_to_sync(layer.group_send)(
+                lobby_group(user_id),
+                {
+                    "type": "match.matched",
+                    "sessionId": str(session.session_id),
+                    "payload": {"peerUserId": peer_id},
+                },
+            )
+        except Exception:
+            pass
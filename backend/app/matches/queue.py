@@ -0,0 +1,617 @@
+# app/matches/queue.py
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from django.conf import settings
+
+from app.common.redis_client import get_redis, get_script
+
+# 전체 대기열: user_id -> 대기 시작 시각(score)
+WAITING_POOL_KEY = "match:waiting"
+# 대기 티켓: user_id -> 미리 발급한 sessionId (DB row는 짝이 정해질 때 생성)
+TICKETS_KEY = "match:tickets"
+# 대기자가 들어가 있는 pool 목록: user_id -> "pool1 pool2 ..."
+TICKET_POOLS_KEY = "match:ticket_pools"
+
+INF = float("inf")
+RESULT_KEY_PREFIX = "match:result:"
+RESULT_TTL_SEC = 60 * 5
+# 최근 매칭 상대: user_id별 zset(상대 user_id -> 매칭 시각). 창 안의 상대는 다시 안 붙임
+RECENT_KEY_PREFIX = "match:recent:"
+# 대기열 앞쪽 몇 명까지 훑으며 최근 상대를 건너뛸지
+RECENT_SCAN_LIMIT = 16
+
+
+def geo_pool_key(cell: str) -> str:
+    return f"match:waiting:geo:{cell}"
+
+
+def recent_key(user_id: int) -> str:
+    return f"{RECENT_KEY_PREFIX}{user_id}"
+
+
+def recent_window_sec() -> int:
+    # 0이면 최근 상대 제외 끔
+    return int(getattr(settings, "MATCH_RECENT_PARTNER_SEC", 6 * 3600))
+
+
+def recent_max() -> int:
+    return int(getattr(settings, "MATCH_RECENT_PARTNER_MAX", 200))
+
+
+def result_key(user_id: int) -> str:
+    # 대기하다가 짝이 정해진 유저가 다음 요청 때 받아갈 sessionId
+    return f"{RESULT_KEY_PREFIX}{user_id}"
+
+
+@dataclass(frozen=True)
+class ShardKeys:
+    pool: str  # zset user_id -> 대기 시작 시각
+    tickets: str  # hash user_id -> sessionId
+    results: str  # hash user_id -> 짝이 정해진 sessionId (유저별 결과 key 대신)
+    result_at: (
+        str  # zset user_id -> 결과 기록 시각 (리퍼가 RESULT_TTL_SEC 지난 것 정리)
+    )
+
+    @property
+    def all(self) -> List[str]:
+        return [self.pool, self.tickets, self.results, self.result_at]
+
+
+def shard_keys(shard: str) -> ShardKeys:
+    # {shard} hash tag -> 한 shard의 key는 Redis Cluster에서 같은 slot
+    tag = "{" + shard + "}"
+    return ShardKeys(
+        pool=f"match:waiting:shard:{tag}",
+        tickets=f"match:tickets:shard:{tag}",
+        results=f"match:results:shard:{tag}",
+        result_at=f"match:result_at:shard:{tag}",
+    )
+
+
+# 매칭된 두 사람을 서로의 최근 상대 zset에 기록 (창 밖/개수 초과분은 잘라냄)
+_REMEMBER_LUA = """
+local function remember(prefix, a, b, now, window, cap)
+  if tonumber(window) <= 0 then
+    return
+  end
+  for _, p in ipairs({{a, b}, {b, a}}) do
+    local key = prefix .. p[1]
+    redis.call('ZADD', key, now, p[2])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', tonumber(now) - tonumber(window))
+    redis.call('ZREMRANGEBYRANK', key, 0, -(tonumber(cap) + 1))
+    redis.call('EXPIRE', key, window)
+  end
+end
+"""
+
+# 원자적으로 "후보 pool에서 상대 pop" 또는 "나를 대기열에 추가"
+# KEYS[1]=티켓 hash, KEYS[2]=티켓 pool hash, KEYS[3]=내 결과 key, KEYS[4]=내 최근 상대 zset,
+# KEYS[5..]=후보 pool(zset, 탐색 순서대로)
+# ARGV[1]=user_id, ARGV[2]=새 sessionId, ARGV[3]=now(score),
+# ARGV[4]=내가 들어갈 pool 목록(공백 구분), ARGV[5]=결과 key prefix, ARGV[6]=결과 TTL,
+# ARGV[7]=최근 상대 key prefix, ARGV[8]=최근 상대 창(초), ARGV[9]=최근 상대 최대 개수,
+# ARGV[10]=pool마다 훑을 대기자 수, ARGV[11..]=후보 pool별 max score
+#   (max score = "이 시각 이전부터 기다린 사람만" -> 오래 기다린 사람만 넓은 pool에 노출)
+# 최근 상대는 ZSCORE 한 번으로 O(1) 확인 -> 건너뛰고 다음 대기자
+# return: {"WAITING", sessionId} | {"RESULT", sessionId}
+#       | {"MATCHED", sessionId, partnerUserId, waitedSince, partnerPools}
+# 상대의 pool/결과 key는 실행 중에야 알 수 있어서 KEYS 밖의 key를 건드림 (단일 Redis 기준,
+# Cluster는 MATCH_SHARDING -> 아래 shard 스크립트)
+# 상대 결과 key는 pop과 같은 스크립트 안에서 써야 "티켓도 결과도 없는" 틈이 안 생김
+_POP_OR_ENQUEUE_LUA = _REMEMBER_LUA + """
+local done = redis.call('GET', KEYS[3])
+if done then
+  return {'RESULT', done}
+end
+
+local mine = redis.call('HGET', KEYS[1], ARGV[1])
+if mine then
+  return {'WAITING', mine}
+end
+
+local recent_cutoff = tonumber(ARGV[3]) - tonumber(ARGV[8])
+for i = 5, #KEYS do
+  local heads = redis.call('ZRANGEBYSCORE', KEYS[i], '-inf', ARGV[i + 6], 'WITHSCORES', 'LIMIT', 0, ARGV[10])
+  for j = 1, #heads, 2 do
+    local partner = heads[j]
+    local seen = redis.call('ZSCORE', KEYS[4], partner)
+    if not (seen and tonumber(seen) > recent_cutoff) then
+      local sid = redis.call('HGET', KEYS[1], partner)
+      local pools = redis.call('HGET', KEYS[2], partner) or KEYS[i]
+      for pool in string.gmatch(pools, '%S+') do
+        redis.call('ZREM', pool, partner)
+      end
+      redis.call('ZREM', KEYS[i], partner)
+      redis.call('HDEL', KEYS[1], partner)
+      redis.call('HDEL', KEYS[2], partner)
+      if sid then
+        redis.call('SET', ARGV[5] .. partner, sid, 'EX', ARGV[6])
+        remember(ARGV[7], ARGV[1], partner, ARGV[3], ARGV[8], ARGV[9])
+        return {'MATCHED', sid, partner, heads[j + 1], pools}
+      end
+    end
+  end
+end
+
+for pool in string.gmatch(ARGV[4], '%S+') do
+  redis.call('ZADD', pool, ARGV[3], ARGV[1])
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[4])
+return {'WAITING', ARGV[2]}
+"""
+
+# 내 티켓이 sessionId와 일치할 때만 대기열에서 제거
+_CANCEL_LUA = """
+local mine = redis.call('HGET', KEYS[1], ARGV[1])
+if mine ~= ARGV[2] then
+  return 0
+end
+local pools = redis.call('HGET', KEYS[2], ARGV[1]) or ''
+for pool in string.gmatch(pools, '%S+') do
+  redis.call('ZREM', pool, ARGV[1])
+end
+redis.call('HDEL', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+return 1
+"""
+
+
+def _score(v: float) -> str:
+    return "+inf" if v == INF else repr(v)
+
+
+@dataclass
+class QueueResult:
+    session_id: str
+    partner_id: Optional[int] = None  # None이면 아직 대기 중
+    waited_since: Optional[float] = None
+    partner_pools: Tuple[str, ...] = ()
+    resolved: bool = False  # 대기 중에 이미 짝이 정해진 세션
+    partner_shard: Optional[str] = None  # shard 대기열에서 pop했으면 상대의 shard
+
+
+def pop_or_enqueue(
+    user_id: int,
+    candidates: Sequence[Tuple[str, float]] = ((WAITING_POOL_KEY, INF),),
+    enqueue: Sequence[str] = (WAITING_POOL_KEY,),
+    now: Optional[float] = None,
+) -> QueueResult:
+    """
+    candidates: (pool key, max score) 목록. 앞에서부터 탐색해 처음 찾은 대기자와 짝.
+      (최근 매칭 상대는 건너뜀 -> recent_window_sec)
+    enqueue: 못 찾았을 때 내가 들어갈 pool 목록 (WAITING_POOL_KEY는 항상 포함)
+    """
+    now = time.time() if now is None else now
+    pools: List[str] = [WAITING_POOL_KEY] + [
+        p for p in enqueue if p != WAITING_POOL_KEY
+    ]
+
+    res = get_script("queue_pop_or_enqueue", _POP_OR_ENQUEUE_LUA)(
+        keys=[TICKETS_KEY, TICKET_POOLS_KEY, result_key(user_id), recent_key(user_id)]
+        + [k for k, _ in candidates],
+        args=[
+            user_id,
+            str(uuid.uuid4()),
+            now,
+            " ".join(pools),
+            RESULT_KEY_PREFIX,
+            RESULT_TTL_SEC,
+            RECENT_KEY_PREFIX,
+            recent_window_sec(),
+            recent_max(),
+            RECENT_SCAN_LIMIT,
+        ]
+        + [_score(max_score) for _, max_score in candidates],
+    )
+    if res[0] == "MATCHED":
+        return QueueResult(
+            session_id=res[1],
+            partner_id=int(res[2]),
+            waited_since=float(res[3]),
+            partner_pools=tuple(res[4].split()),
+        )
+    return QueueResult(session_id=res[1], resolved=res[0] == "RESULT")
+
+
+def requeue(
+    user_id: int,
+    session_id: str,
+    waited_since: float,
+    enqueue: Sequence[str] = (WAITING_POOL_KEY,),
+) -> None:
+    """
+    짝 확정(DB 저장)에 실패했을 때 상대를 원래 순번 그대로 되돌려 놓기
+    """
+    pools = [WAITING_POOL_KEY] + [p for p in enqueue if p != WAITING_POOL_KEY]
+    r = get_redis()
+    pipe = r.pipeline()
+    for pool in pools:
+        pipe.zadd(pool, {str(user_id): waited_since})
+    pipe.hset(TICKETS_KEY, str(user_id), session_id)
+    pipe.hset(TICKET_POOLS_KEY, str(user_id), " ".join(pools))
+    pipe.delete(result_key(user_id))
+    pipe.execute()
+
+
+def cancel_waiting(user_id: int, session_id: str, shard: Optional[str] = None) -> bool:
+    if shard:
+        k = shard_keys(shard)
+        res = get_script("queue_shard_cancel", _SHARD_CANCEL_LUA)(
+            keys=[k.pool, k.tickets], args=[user_id, str(session_id)]
+        )
+    else:
+        res = get_script("queue_cancel", _CANCEL_LUA)(
+            keys=[TICKETS_KEY, TICKET_POOLS_KEY],
+            args=[user_id, str(session_id)],
+        )
+    return bool(res)
+
+
+# 배치 매처용: 스냅샷 이후에도 두 사람 티켓이 그대로일 때만 한 쌍씩 확보
+# 세션 id는 a의 티켓 -> 두 사람 결과 key에 같이 기록, 서로 최근 상대로 기록
+# KEYS[1]=티켓 hash, KEYS[2]=티켓 pool hash
+# ARGV[1]=결과 key prefix, ARGV[2]=결과 TTL, ARGV[3]=최근 상대 key prefix,
+# ARGV[4]=최근 상대 창(초), ARGV[5]=최근 상대 최대 개수, ARGV[6]=now,
+# ARGV[7..] = (uid_a, sid_a, uid_b, sid_b) 반복
+# return: 확보한 쌍의 (index, pools_a, pools_b) 반복
+_CLAIM_PAIRS_LUA = _REMEMBER_LUA + """
+local out = {}
+for i = 7, #ARGV, 4 do
+  local a, sa, b, sb = ARGV[i], ARGV[i + 1], ARGV[i + 2], ARGV[i + 3]
+  if redis.call('HGET', KEYS[1], a) == sa and redis.call('HGET', KEYS[1], b) == sb then
+    local pa = redis.call('HGET', KEYS[2], a) or ''
+    local pb = redis.call('HGET', KEYS[2], b) or ''
+    for pool in string.gmatch(pa, '%S+') do
+      redis.call('ZREM', pool, a)
+    end
+    for pool in string.gmatch(pb, '%S+') do
+      redis.call('ZREM', pool, b)
+    end
+    redis.call('HDEL', KEYS[1], a, b)
+    redis.call('HDEL', KEYS[2], a, b)
+    redis.call('SET', ARGV[1] .. a, sa, 'EX', ARGV[2])
+    redis.call('SET', ARGV[1] .. b, sa, 'EX', ARGV[2])
+    remember(ARGV[3], a, b, ARGV[6], ARGV[4], ARGV[5])
+    table.insert(out, tostring((i - 7) / 4))
+    table.insert(out, pa)
+    table.insert(out, pb)
+  end
+end
+return out
+"""
+
+
+@dataclass
+class Ticket:
+    user_id: int
+    session_id: str
+    waited_since: float
+    shard: Optional[str] = None
+
+
+def snapshot(
+    pool: str = WAITING_POOL_KEY,
+    limit: int = 0,
+    max_score: float = INF,
+    shard: Optional[str] = None,
+) -> List[Ticket]:
+    """
+    pool 대기자를 오래 기다린 순으로 (limit=0이면 전부)
+    max_score를 주면 그 시각 이전부터 기다린 사람만
+    shard를 주면 pool 대신 그 shard 대기열
+    """
+    r = get_redis()
+    tickets = TICKETS_KEY
+    if shard:
+        k = shard_keys(shard)
+        pool, tickets = k.pool, k.tickets
+    page = {"start": 0, "num": limit} if limit > 0 else {}
+    rows = r.zrangebyscore(pool, "-inf", max_score, withscores=True, **page)
+    if not rows:
+        return []
+    sids = r.hmget(tickets, [uid for uid, _ in rows])
+    return [
+        Ticket(user_id=int(uid), session_id=sid, waited_since=float(score), shard=shard)
+        for (uid, score), sid in zip(rows, sids)
+        if sid
+    ]
+
+
+def claim_pairs(
+    pairs: Sequence[Tuple[Ticket, Ticket]],
+) -> List[Tuple[Ticket, Ticket, Tuple[str, ...], Tuple[str, ...]]]:
+    if not pairs:
+        return []
+    args = [
+        RESULT_KEY_PREFIX,
+        RESULT_TTL_SEC,
+        RECENT_KEY_PREFIX,
+        recent_window_sec(),
+        recent_max(),
+        time.time(),
+    ]
+    for a, b in pairs:
+        args += [a.user_id, a.session_id, b.user_id, b.session_id]
+    res = get_script("queue_claim_pairs", _CLAIM_PAIRS_LUA)(
+        keys=[TICKETS_KEY, TICKET_POOLS_KEY], args=args
+    )
+    out = []
+    for i in range(0, len(res), 3):
+        a, b = pairs[int(res[i])]
+        out.append((a, b, tuple(res[i + 1].split()), tuple(res[i + 2].split())))
+    return out
+
+
+def clear_result(user_id: int, shard: Optional[str] = None) -> None:
+    if shard:
+        k = shard_keys(shard)
+        pipe = get_redis().pipeline()
+        pipe.hdel(k.results, str(user_id))
+        pipe.zrem(k.result_at, str(user_id))
+        pipe.execute()
+        return
+    get_redis().delete(result_key(user_id))
+
+
+def peek_result(user_id: int, shard: Optional[str] = None) -> Optional[str]:
+    if shard:
+        return get_redis().hget(shard_keys(shard).results, str(user_id))
+    return get_redis().get(result_key(user_id))
+
+
+def recent_partners(
+    user_ids: Sequence[int], now: Optional[float] = None
+) -> Dict[int, Set[int]]:
+    """
+    여러 유저의 최근 매칭 상대를 pipeline 한 번으로 (배치 매처용)
+    """
+    window = recent_window_sec()
+    if window <= 0 or not user_ids:
+        return {}
+    now = time.time() if now is None else now
+    pipe = get_redis().pipeline()
+    for uid in user_ids:
+        pipe.zrangebyscore(recent_key(uid), now - window, "+inf")
+    return {
+        uid: {int(p) for p in partners}
+        for uid, partners in zip(user_ids, pipe.execute())
+        if partners
+    }
+
+
+def remember_pairs(pairs: Sequence[Tuple[int, int]], now: float) -> None:
+    """
+    _REMEMBER_LUA와 같은 기록을 pipeline으로 (shard 경로: 유저별 key라 shard 스크립트 밖에서)
+    """
+    window = recent_window_sec()
+    if window <= 0 or not pairs:
+        return
+    cap = recent_max()
+    pipe = get_redis().pipeline(transaction=False)
+    for a, b in pairs:
+        for me, other in ((a, b), (b, a)):
+            key = recent_key(me)
+            pipe.zadd(key, {str(other): now})
+            pipe.zremrangebyscore(key, "-inf", now - window)
+            pipe.zremrangebyrank(key, 0, -(cap + 1))
+            pipe.expire(key, window)
+    pipe.execute()
+
+
+# --- 지역 shard (MATCH_SHARDING) ---------------------------------------------
+# 스크립트 하나는 shard 하나의 key(ShardKeys, 같은 slot)만 KEYS로 선언해서 건드림
+# -> Redis Cluster에서도 동작. 전체 대기열(WAITING_POOL_KEY)과 pool 목록 hash는 안 씀
+# 최근 상대는 유저별 key라 slot이 제각각 -> 미리 읽어서 ARGV로 넘기고, 기록은 매칭 뒤 pipeline
+
+# KEYS = ShardKeys.all
+# ARGV[1]=user_id ('' = 다른 shard 유저가 상대만 pop), ARGV[2]=새 sessionId ('' = 대기열에 안 넣음),
+# ARGV[3]=now, ARGV[4]=max score, ARGV[5]=훑을 대기자 수, ARGV[6..]=건너뛸 user_id (나, 최근 상대)
+# return: {"WAITING", sessionId} | {"RESULT", sessionId} | {"NONE"}
+#       | {"MATCHED", sessionId, partnerUserId, waitedSince}
+_SHARD_POP_LUA = """
+local me = ARGV[1]
+if me ~= '' then
+  local done = redis.call('HGET', KEYS[3], me)
+  if done then
+    return {'RESULT', done}
+  end
+  local mine = redis.call('HGET', KEYS[2], me)
+  if mine then
+    return {'WAITING', mine}
+  end
+end
+
+local skip = {}
+for i = 6, #ARGV do
+  skip[ARGV[i]] = true
+end
+local heads = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[4], 'WITHSCORES', 'LIMIT', 0, ARGV[5])
+for j = 1, #heads, 2 do
+  local partner = heads[j]
+  if not skip[partner] then
+    local sid = redis.call('HGET', KEYS[2], partner)
+    redis.call('ZREM', KEYS[1], partner)
+    redis.call('HDEL', KEYS[2], partner)
+    if sid then
+      redis.call('HSET', KEYS[3], partner, sid)
+      redis.call('ZADD', KEYS[4], ARGV[3], partner)
+      return {'MATCHED', sid, partner, heads[j + 1]}
+    end
+  end
+end
+
+if ARGV[2] == '' then
+  return {'NONE'}
+end
+redis.call('ZADD', KEYS[1], ARGV[3], me)
+redis.call('HSET', KEYS[2], me, ARGV[2])
+return {'WAITING', ARGV[2]}
+"""
+
+# KEYS[1]=pool, KEYS[2]=티켓 hash / ARGV[1]=user_id, ARGV[2]=sessionId
+_SHARD_CANCEL_LUA = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+  return 0
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+return 1
+"""
+
+# 배치 매처용 claim_pairs의 shard 버전
+# KEYS = ShardKeys.all / ARGV[1]=now,
+# ARGV[2..] = (세션 id, uid_a, sid_a, uid_b, sid_b) 반복. uid_b가 ''면 a 한 명만 (상대는 다른 shard)
+# return: 확보한 항목 index 목록
+_SHARD_CLAIM_LUA = """
+local out = {}
+for i = 2, #ARGV, 5 do
+  local session, a, sa, b, sb = ARGV[i], ARGV[i + 1], ARGV[i + 2], ARGV[i + 3], ARGV[i + 4]
+  if redis.call('HGET', KEYS[2], a) == sa and (b == '' or redis.call('HGET', KEYS[2], b) == sb) then
+    for _, u in ipairs({a, b}) do
+      if u ~= '' then
+        redis.call('ZREM', KEYS[1], u)
+        redis.call('HDEL', KEYS[2], u)
+        redis.call('HSET', KEYS[3], u, session)
+        redis.call('ZADD', KEYS[4], ARGV[1], u)
+      end
+    end
+    table.insert(out, tostring((i - 2) / 5))
+  end
+end
+return out
+"""
+
+# KEYS[1]=결과 hash, KEYS[2]=결과 시각 zset / ARGV[1]=cutoff, ARGV[2]=최대 개수
+_SHARD_EXPIRE_RESULTS_LUA = """
+local old = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, u in ipairs(old) do
+  redis.call('HDEL', KEYS[1], u)
+  redis.call('ZREM', KEYS[2], u)
+end
+return #old
+"""
+
+
+def _shard_pop(
+    shard: str, me, new_sid: str, now: float, max_score: float, skip: List[str]
+):
+    return get_script("queue_shard_pop", _SHARD_POP_LUA)(
+        keys=shard_keys(shard).all,
+        args=[me, new_sid, now, _score(max_score), RECENT_SCAN_LIMIT] + skip,
+    )
+
+
+def shard_pop_or_enqueue(
+    user_id: int,
+    shard: str,
+    neighbors: Sequence[str] = (),
+    spill_cutoff: float = INF,
+    search: bool = True,
+    now: Optional[float] = None,
+) -> QueueResult:
+    """
+    pop_or_enqueue의 shard 버전. 스크립트 1번에 shard 1개씩:
+      내 shard에서 pop -> 없으면 이웃 shard에서 spill_cutoff 이전부터 기다린 사람 pop
+      -> 그래도 없으면 내 shard에서 한 번 더 pop 시도 후 대기열에 추가
+    search=False면 대기열에 넣기만 (batch)
+    """
+    now = time.time() if now is None else now
+    skip = [str(user_id)] + [
+        str(p) for p in recent_partners([user_id], now).get(user_id, ())
+    ]
+    own_max = INF if search else -INF
+
+    res = _shard_pop(shard, user_id, "", now, own_max, skip)
+    partner_shard = shard
+    if res[0] == "NONE":
+        for n in neighbors if search else ():
+            res = _shard_pop(n, "", "", now, spill_cutoff, skip)
+            if res[0] != "NONE":
+                partner_shard = n
+                break
+        else:
+            res = _shard_pop(shard, user_id, str(uuid.uuid4()), now, own_max, skip)
+
+    if res[0] == "MATCHED":
+        remember_pairs([(user_id, int(res[2]))], now)
+        return QueueResult(
+            session_id=res[1],
+            partner_id=int(res[2]),
+            waited_since=float(res[3]),
+            partner_shard=partner_shard,
+        )
+    return QueueResult(session_id=res[1], resolved=res[0] == "RESULT")
+
+
+def shard_requeue(
+    shard: str, user_id: int, session_id: str, waited_since: float
+) -> None:
+    k = shard_keys(shard)
+    pipe = get_redis().pipeline()  # MULTI: 같은 slot key만
+    pipe.zadd(k.pool, {str(user_id): waited_since})
+    pipe.hset(k.tickets, str(user_id), session_id)
+    pipe.hdel(k.results, str(user_id))
+    pipe.zrem(k.result_at, str(user_id))
+    pipe.execute()
+
+
+def _shard_claim(shard: str, args: list) -> List[str]:
+    return get_script("queue_shard_claim", _SHARD_CLAIM_LUA)(
+        keys=shard_keys(shard).all, args=args
+    )
+
+
+def claim_shard_pairs(
+    pairs: Sequence[Tuple[Ticket, Ticket]],
+) -> List[Tuple[Ticket, Ticket]]:
+    """
+    snapshot(shard=...)으로 얻은 티켓 쌍 확보 (세션 id는 a의 티켓)
+    같은 shard 쌍은 shard마다 스크립트 1번. shard가 다른 쌍은 b -> a 순으로 한 명씩 확보하고
+    a를 못 잡으면 b를 되돌림 (그 사이 b가 조회하면 잠깐 a의 sessionId로 WAITING)
+    """
+    now = time.time()
+    claimed = set()
+
+    by_shard: Dict[str, List[int]] = defaultdict(list)
+    for i, (a, b) in enumerate(pairs):
+        if a.shard == b.shard:
+            by_shard[a.shard].append(i)
+    for shard, idx in by_shard.items():
+        args = [now]
+        for i in idx:
+            a, b = pairs[i]
+            args += [a.session_id, a.user_id, a.session_id, b.user_id, b.session_id]
+        claimed.update(idx[int(k)] for k in _shard_claim(shard, args))
+
+    for i, (a, b) in enumerate(pairs):
+        if a.shard == b.shard:
+            continue
+        if not _shard_claim(
+            b.shard, [now, a.session_id, b.user_id, b.session_id, "", ""]
+        ):
+            continue
+        if _shard_claim(a.shard, [now, a.session_id, a.user_id, a.session_id, "", ""]):
+            claimed.add(i)
+        else:
+            shard_requeue(b.shard, b.user_id, b.session_id, b.waited_since)
+
+    out = [pairs[i] for i in sorted(claimed)]
+    remember_pairs([(a.user_id, b.user_id) for a, b in out], now)
+    return out
+
+
+def expire_shard_results(shard: str, now: float, limit: int) -> int:
+    """
+    RESULT_TTL_SEC 넘게 안 가져간 결과 정리 (유저별 결과 key의 TTL 대신)
+    """
+    k = shard_keys(shard)
+    return int(
+        get_script("queue_shard_expire_results", _SHARD_EXPIRE_RESULTS_LUA)(
+            keys=[k.results, k.result_at], args=[now - RESULT_TTL_SEC, limit]
+        )
+    )
@@ -0,0 +1,97 @@
+# app/matches/ratelimit.py
+import math
+import time
+
+from django.conf import settings
+
+from app.common.redis_client import get_async_redis, get_async_script, get_script
+
+# 시그널링 메시지 폭주 방지: connection별(프로세스 안) + session별(Redis, 워커 공유) token bucket
+# bucket_allow는 같은 Redis bucket의 동기 버전 (REST view용, 예: 연락처 가져오기)
+RATE_LIMIT_CLOSE_CODE = 4429
+
+
+def _conf(name: str, default: float) -> float:
+    return float(getattr(settings, name, default))
+
+
+class TokenBucket:
+    """
+    초당 rate개씩 차고 최대 burst개까지 쌓이는 토큰. 메시지 1개 = 토큰 1개
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def allow(self, cost: float = 1.0) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+
+def connection_bucket() -> TokenBucket:
+    return TokenBucket(
+        _conf("SIGNALING_RATE_PER_SEC", 20), _conf("SIGNALING_RATE_BURST", 60)
+    )
+
+
+def session_bucket_key(session_id: str) -> str:
+    return f"ws:rate:session:{session_id}"
+
+
+# KEYS[1]=bucket hash(tokens, ts) / ARGV[1]=rate, ARGV[2]=burst, ARGV[3]=now, ARGV[4]=cost, ARGV[5]=TTL
+# return: 1 허용, 0 거부
+_SESSION_BUCKET_LUA = """
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local now, cost = tonumber(ARGV[3]), tonumber(ARGV[4])
+local v = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(v[1]) or burst
+local ts = tonumber(v[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local ok = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  ok = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return ok
+"""
+
+
+async def session_allow(session_id: str, cost: float = 1.0) -> bool:
+    """
+    방 전체(참가자 합산) 중계 메시지 한도. Redis 장애면 막지 않음
+    """
+    rate = _conf("SIGNALING_SESSION_RATE_PER_SEC", 50)
+    burst = _conf("SIGNALING_SESSION_RATE_BURST", 150)
+    try:
+        ok = await get_async_script("ratelimit_bucket", _SESSION_BUCKET_LUA)(
+            keys=[session_bucket_key(session_id)],
+            args=[rate, burst, time.time(), cost, math.ceil(burst / rate) + 1],
+            client=get_async_redis(),
+        )
+    except Exception:
+        return True
+    return bool(ok)
+
+
+def bucket_allow(key: str, rate: float, burst: float, cost: float = 1.0) -> bool:
+    """
+    Redis token bucket (동기). Redis 장애면 막지 않음
+    """
+    try:
+        ok = get_script("ratelimit_bucket", _SESSION_BUCKET_LUA)(
+            keys=[key],
+            args=[rate, burst, time.time(), cost, math.ceil(burst / rate) + 1],
+        )
+    except Exception:
+        return True
+    return bool(ok)
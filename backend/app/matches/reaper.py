@@ -0,0 +1,146 @@
+# app/matches/reaper.py
+import time
+from dataclasses import dataclass
+from typing import Optional
+from datetime import timedelta
+
+from django.utils import timezone
+
+from app.common.presence import online_user_ids
+from app.common.redis_client import get_redis
+from app.matches import queue, shards
+from app.matches.models import MatchSession
+from app.matches.redis_store import (
+    EXPIRY_KEY,
+    delete_session_state,
+    session_key,
+    session_ttl_sec,
+    waiting_ttl_sec,
+)
+
+SWEEP_BATCH = 500
+
+
+@dataclass
+class ReapStats:
+    waiting_canceled: int = 0
+    sessions_canceled: int = 0
+    sessions_extended: int = 0
+    legacy_canceled: int = 0
+
+
+def _waiting_queues():
+    """
+    (pool, 티켓 hash, shard) - 전체 대기열 + MATCH_SHARDING이면 shard별 대기열
+    """
+    yield queue.WAITING_POOL_KEY, queue.TICKETS_KEY, None
+    if shards.sharding_enabled():
+        for shard in shards.all_shards():
+            k = queue.shard_keys(shard)
+            yield k.pool, k.tickets, shard
+
+
+def reap_waiting(now: float, stats: ReapStats) -> None:
+    """
+    대기열에서 TTL 넘게 기다렸는데 presence 하트비트가 없는 유저의 티켓 취소
+    """
+    r = get_redis()
+    for pool, tickets, shard in _waiting_queues():
+        stale = r.zrangebyscore(
+            pool, "-inf", now - waiting_ttl_sec(), start=0, num=SWEEP_BATCH
+        )
+        if not stale:
+            continue
+
+        user_ids = [int(uid) for uid in stale]
+        online = online_user_ids(user_ids)
+        offline = [uid for uid in user_ids if uid not in online]
+        if not offline:
+            continue
+
+        sids = r.hmget(tickets, [str(uid) for uid in offline])
+        for uid, sid in zip(offline, sids):
+            if sid and queue.cancel_waiting(uid, sid, shard):
+                delete_session_state(sid)
+                stats.waiting_canceled += 1
+            elif not sid:
+                # 티켓 없이 pool에만 남은 찌꺼기
+                r.zrem(pool, str(uid))
+
+
+def reap_shard_results(now: float) -> None:
+    """
+    shard 대기열 결과 hash는 key TTL이 없어서 오래된 항목을 직접 정리
+    """
+    if not shards.sharding_enabled():
+        return
+    for shard in shards.all_shards():
+        queue.expire_shard_results(shard, now, SWEEP_BATCH)
+
+
+def reap_sessions(now: float, stats: ReapStats) -> None:
+    """
+    TTL 지난 MATCHED/CALLING 세션 중 두 사람 다 presence가 없는 것만 bulk UPDATE로 취소.
+    한 명이라도 살아 있으면(통화 중) 만료 시각을 뒤로 미룸.
+    """
+    r = get_redis()
+    expired = r.zrangebyscore(
+        EXPIRY_KEY, "-inf", now - session_ttl_sec(), start=0, num=SWEEP_BATCH
+    )
+    if not expired:
+        return
+
+    rows = list(
+        MatchSession.objects.filter(session_id__in=expired).values(
+            "session_id", "user_a_id", "user_b_id", "status"
+        )
+    )
+    online = online_user_ids(
+        {uid for row in rows for uid in (row["user_a_id"], row["user_b_id"]) if uid}
+    )
+
+    to_cancel, to_extend = [], []
+    for row in rows:
+        if row["status"] not in ("WAITING", "MATCHED", "CALLING"):
+            continue
+        if row["user_a_id"] in online or row["user_b_id"] in online:
+            to_extend.append(str(row["session_id"]))
+        else:
+            to_cancel.append(str(row["session_id"]))
+
+    if to_cancel:
+        stats.sessions_canceled += MatchSession.objects.filter(
+            session_id__in=to_cancel, status__in=["WAITING", "MATCHED", "CALLING"]
+        ).update(status="CANCELED", ended_at=timezone.now())
+
+    pipe = r.pipeline()
+    extended = set(to_extend)
+    for sid in expired:
+        if sid in extended:
+            pipe.zadd(EXPIRY_KEY, {sid: now})
+        else:
+            # 취소했거나 이미 끝났거나 DB에 없는 세션
+            pipe.zrem(EXPIRY_KEY, sid)
+            pipe.delete(session_key(sid))
+    pipe.execute()
+    stats.sessions_extended += len(to_extend)
+
+
+def reap_legacy_waiting(stats: ReapStats) -> None:
+    """
+    Redis 대기열 이전에 만들어진 DB WAITING row 정리
+    """
+    cutoff = timezone.now() - timedelta(seconds=waiting_ttl_sec())
+    stats.legacy_canceled += MatchSession.objects.filter(
+        status="WAITING", started_at__lt=cutoff
+    ).update(status="CANCELED", ended_at=timezone.now())
+
+
+def reap(now: Optional[float] = None) -> ReapStats:
+    now = time.time() if now is None else now
+    stats = ReapStats()
+    reap_waiting(now, stats)
+    reap_shard_results(now)
+    reap_sessions(now, stats)
+    reap_legacy_waiting(stats)
+    return stats
@@ -1,26 +1,149 @@
 # app/matches/redis_store.py
-import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
 import redis
 from django.conf import settings
 
-r = redis.Redis(
-    host=getattr(settings, "REDIS_HOST", "127.0.0.1"),
-    port=int(getattr(settings, "REDIS_PORT", 6379)),
-    db=int(getattr(settings, "REDIS_DB", 0)),
-    decode_responses=True,
-)
+from app.common.redis_client import get_redis
+from app.matches.models import MatchSession
+
+# 진행 중(MATCHED/CALLING) 세션 만료 인덱스: sessionId -> started_at(epoch)
+# reap_match_sessions가 오래된 것부터 훑어서 정리
+EXPIRY_KEY = "match:expiry"
+
+ACTIVE_STATUSES = ("MATCHED", "CALLING")
+CLOSED_STATUSES = ("ENDED", "CANCELED")
+CLOSED_STATE_TTL_SEC = 60 * 10
+
 
 def session_key(session_id: str) -> str:
+    # hash: sessionId / status / userAId / userBId
     return f"match:session:{session_id}"
 
-def save_session_state(session, *, status: str, ttl_sec: int = 3600):
-    payload = {
-        "sessionId": str(session.session_id),
+
+@dataclass
+class SessionState:
+    session_id: str
+    status: str
+    user_a_id: Optional[int]
+    user_b_id: Optional[int]
+    started_at: Optional[datetime] = None  # DB에서 읽었을 때만 (만료 인덱스 score)
+
+    def has_member(self, user_id: int) -> bool:
+        return user_id is not None and user_id in (self.user_a_id, self.user_b_id)
+
+    def peer_of(self, user_id: int) -> Optional[int]:
+        return self.user_b_id if self.user_a_id == user_id else self.user_a_id
+
+
+def waiting_ttl_sec() -> int:
+    return int(getattr(settings, "MATCH_WAITING_TTL_SEC", 120))
+
+
+def session_ttl_sec() -> int:
+    return int(getattr(settings, "MATCH_SESSION_TTL_SEC", 3600))
+
+
+def _ttl_for(status: str) -> int:
+    # 상태 key는 리퍼가 정리하기 전에 먼저 사라지지 않도록 리퍼 기준보다 넉넉하게
+    if status == "WAITING":
+        return waiting_ttl_sec() * 2
+    if status in ACTIVE_STATUSES:
+        return session_ttl_sec() * 2
+    return CLOSED_STATE_TTL_SEC
+
+
+def _int_or_none(v) -> Optional[int]:
+    return int(v) if v not in (None, "") else None
+
+
+def save_session_state(session, *, status: str, ttl_sec: Optional[int] = None):
+    """
+    상태 hash + 만료 인덱스를 MULTI pipeline 하나로 기록 (반쯤 써진 상태가 안 보이게)
+    DEL 먼저: 예전 JSON 문자열 key가 남아 있어도 hash로 덮어씀
+    """
+    sid = str(session.session_id)
+    key = session_key(sid)
+    mapping = {
+        "sessionId": sid,
         "status": status,
-        "userAId": session.user_a_id,
-        "userBId": session.user_b_id,
+        "userAId": session.user_a_id or "",
+        "userBId": session.user_b_id or "",
     }
-    r.set(session_key(str(session.session_id)), json.dumps(payload), ex=ttl_sec)
+
+    pipe = get_redis().pipeline()
+    pipe.delete(key)
+    pipe.hset(key, mapping=mapping)
+    pipe.expire(key, ttl_sec or _ttl_for(status))
+    if status in ACTIVE_STATUSES:
+        started = getattr(session, "started_at", None)
+        score = started.timestamp() if started else time.time()
+        pipe.zadd(EXPIRY_KEY, {sid: score}, nx=True)
+    elif status != "WAITING":
+        pipe.zrem(EXPIRY_KEY, sid)
+    pipe.execute()
+
+
+def _cached_state(session_id: str) -> Optional[SessionState]:
+    try:
+        data = get_redis().hgetall(session_key(session_id))
+    except redis.RedisError:
+        # Redis 장애/예전 형식(JSON 문자열) -> DB로
+        return None
+    if not data or not data.get("status"):
+        return None
+    return SessionState(
+        session_id=data.get("sessionId") or session_id,
+        status=data["status"],
+        user_a_id=_int_or_none(data.get("userAId")),
+        user_b_id=_int_or_none(data.get("userBId")),
+    )
+
+
+def get_session_state(
+    session_id: str, *, member_id: Optional[int] = None
+) -> Optional[SessionState]:
+    """
+    read-through: Redis hash -> 없으면 DB에서 읽어 채워 넣음. DB에도 없으면 None
+    참가자는 한 번 정해지면 안 바뀌므로 "member_id가 참가자"인 캐시는 그대로 믿음.
+    WAITING(아직 상대가 안 채워졌을 수 있음)이거나 참가자가 아니면 DB로 재확인
+    """
+    session_id = str(session_id)
+    cached = _cached_state(session_id)
+    if (
+        cached is not None
+        and cached.status != "WAITING"
+        and (member_id is None or cached.has_member(member_id))
+    ):
+        return cached
+
+    row = (
+        MatchSession.objects.filter(session_id=session_id)
+        .values("session_id", "status", "user_a_id", "user_b_id", "started_at")
+        .first()
+    )
+    if row is None:
+        return None
+
+    state = SessionState(
+        session_id=str(row["session_id"]),
+        status=row["status"],
+        user_a_id=row["user_a_id"],
+        user_b_id=row["user_b_id"],
+        started_at=row["started_at"],
+    )
+    try:
+        save_session_state(state, status=state.status)
+    except redis.RedisError:
+        pass
+    return state
+
 
 def delete_session_state(session_id: str):
-    r.delete(session_key(str(session_id)))
+    pipe = get_redis().pipeline()
+    pipe.delete(session_key(str(session_id)))
+    pipe.zrem(EXPIRY_KEY, str(session_id))
+    pipe.execute()
@@ -1,7 +1,8 @@
 # app/matches/routing.py
 from django.urls import re_path
-from .consumers import SignalingConsumer
+from .consumers import SignalingConsumer, MatchLobbyConsumer
 
 websocket_urlpatterns = [
+    re_path(r"^ws/match/lobby/?$", MatchLobbyConsumer.as_asgi()),
     re_path(r"^ws/signaling/(?P<session_id>[^/]+)/?$", SignalingConsumer.as_asgi()),
 ]
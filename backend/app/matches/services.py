@@ -1,44 +1,152 @@
 # app/matches/services.py
-from django.db import transaction
-from django.db.models.functions import Random
+import time
+from typing import List, Optional, Tuple
+
+from django.conf import settings
 
 from app.matches.models import MatchSession
+from app.matches import queue, shards
+from app.matches.notify import notify_matched
+from app.user_locations import geohash
+from app.user_locations.models import UserLocation
 
 
-def create_waiting_session(user) -> MatchSession:
-    return MatchSession.objects.create(user_a=user, status="WAITING")
+def _match_mode() -> str:
+    return getattr(settings, "MATCH_MODE", "random")
 
 
-@transaction.atomic
-def request_match(user) -> MatchSession:
-    """
-    랜덤 매칭 정책:
-    - 내가 이미 WAITING이면 그대로 반환
-    - 후보: WAITING 세션 중 user_a != 나
-    - 후보가 있으면 랜덤 1개 pick -> user_b=나, status=MATCHED
-    - 후보 없으면 내가 WAITING 세션 생성
-    """
-    existing = (
-        MatchSession.objects.select_for_update(skip_locked=True)
-        .filter(user_a=user, status="WAITING")
-        .order_by("-started_at")
+def _user_cell(user) -> Optional[str]:
+    loc = (
+        UserLocation.objects.filter(user_id=user.id)
+        .values_list("latitude", "longitude")
         .first()
     )
-    if existing:
-        return existing
-
-    candidate = (
-        MatchSession.objects.select_for_update(skip_locked=True)
-        .filter(status="WAITING")
-        .exclude(user_a=user)
-        .order_by(Random())
+    if not loc:
+        return None
+    precision = int(getattr(settings, "MATCH_GEOHASH_PRECISION", 5))
+    return geohash.encode(loc[0], loc[1], precision)
+
+
+def _proximity_pools(user, now: float) -> Tuple[List[Tuple[str, float]], List[str]]:
+    """
+    내 geohash 셀 -> 1칸 고리 -> 2칸 고리 ... 순으로 대기자 탐색.
+    근처에 아무도 없으면 오래 기다린 사람(fallback 초 이상)만 전체 대기열에서 허용.
+    위치가 없는 유저는 전체 대기열에서 바로 매칭.
+    """
+    cell = _user_cell(user)
+    if not cell:
+        return [(queue.WAITING_POOL_KEY, queue.INF)], [queue.WAITING_POOL_KEY]
+
+    max_ring = int(getattr(settings, "MATCH_GEOHASH_MAX_RING", 2))
+    fallback_sec = float(getattr(settings, "MATCH_PROXIMITY_FALLBACK_SEC", 20))
+
+    candidates = []
+    for k in range(max_ring + 1):
+        for c in geohash.ring(cell, k):
+            candidates.append((queue.geo_pool_key(c), queue.INF))
+    candidates.append((queue.WAITING_POOL_KEY, now - fallback_sec))
+
+    return candidates, [queue.WAITING_POOL_KEY, queue.geo_pool_key(cell)]
+
+
+def _user_shard(user) -> str:
+    region = (
+        UserLocation.objects.filter(user_id=user.id)
+        .values_list("region", flat=True)
         .first()
     )
+    return shards.shard_for(region or "", getattr(user, "address", "") or "")
+
+
+def match_shard(user) -> Optional[str]:
+    """
+    MATCH_SHARDING이면 이 유저가 대기하는 지역 shard (proximity 모드는 shard 안 씀)
+    """
+    if not shards.sharding_enabled() or _match_mode() == "proximity":
+        return None
+    return _user_shard(user)
+
+
+def request_match(user) -> MatchSession:
+    """
+    매칭 정책 (Redis 대기열):
+    - 내가 이미 대기 중이면 같은 sessionId 그대로 반환
+    - 후보 pool에 다른 사람이 있으면 가장 오래 기다린 1명을 원자적으로 pop
+      -> 그때 DB에 MATCHED 세션 1건 생성 (user_a=상대, user_b=나)
+    - 없으면 나를 대기열에 넣고, 저장되지 않은 WAITING 세션을 반환
+      (sessionId는 미리 발급 -> 짝이 정해지면 같은 id로 DB row 생성)
+    - MATCH_MODE="proximity"면 가까운 geohash 셀부터 탐색
+    - MATCH_MODE="batch"면 대기열에 넣기만 하고 짝은 run_matcher 워커가 정함
+    - MATCH_SHARDING이 켜져 있으면 random/batch 대기열을 지역 shard별로 나눔
+      (내 shard에서 먼저, 이웃 shard는 spill 초 넘게 기다린 사람만. 전체 대기열은 안 씀)
+    - 대기 중에 짝이 정해졌으면 그 세션을 반환
+    """
+    now = time.time()
+    mode = _match_mode()
+    shard = match_shard(user)
+    if shard:
+        result = queue.shard_pop_or_enqueue(
+            user.id,
+            shard,
+            shards.neighbors(shard),
+            now - shards.spill_sec(),
+            search=mode != "batch",
+            now=now,
+        )
+    else:
+        if mode == "proximity":
+            candidates, enqueue = _proximity_pools(user, now)
+        elif mode == "batch":
+            candidates, enqueue = [], [queue.WAITING_POOL_KEY]
+        else:
+            candidates, enqueue = [(queue.WAITING_POOL_KEY, queue.INF)], [
+                queue.WAITING_POOL_KEY
+            ]
+        result = queue.pop_or_enqueue(user.id, candidates, enqueue, now=now)
+
+    if result.resolved:
+        session = MatchSession.objects.filter(session_id=result.session_id).first()
+        if session is None:
+            # 짝은 정해졌고 상대 요청이 아직 DB에 저장 중 -> 같은 sessionId로 조금 더 대기
+            return MatchSession(
+                session_id=result.session_id, user_a=user, status="WAITING"
+            )
+        queue.clear_result(user.id, shard)
+        if session.status in ("ENDED", "CANCELED"):
+            # 그 사이 세션이 끝났으면 새로 대기
+            return request_match(user)
+        return session
+
+    if result.partner_id is None:
+        return MatchSession(session_id=result.session_id, user_a=user, status="WAITING")
+
+    try:
+        session = MatchSession.objects.create(
+            session_id=result.session_id,
+            user_a_id=result.partner_id,
+            user_b=user,
+            status="MATCHED",
+        )
+    except Exception:
+        if result.partner_shard:
+            queue.shard_requeue(
+                result.partner_shard,
+                result.partner_id,
+                result.session_id,
+                result.waited_since,
+            )
+        else:
+            queue.requeue(
+                result.partner_id,
+                result.session_id,
+                result.waited_since,
+                result.partner_pools,
+            )
+        raise
+
+    notify_matched(session)
+    return session
 
-    if not candidate:
-        return create_waiting_session(user)
 
-    candidate.user_b = user
-    candidate.status = "MATCHED"
-    candidate.save(update_fields=["user_b", "status"])
-    return candidate
+def cancel_waiting(user, session_id: str) -> bool:
+    return queue.cancel_waiting(user.id, session_id, match_shard(user))
@@ -0,0 +1,69 @@
+# app/matches/shards.py
+from typing import Dict, List, Sequence
+
+from django.conf import settings
+
+# 지역 shard: 주소/지역 문자열의 단어가 이 prefix로 시작하면 해당 shard
+DEFAULT_SHARDS: Dict[str, Sequence[str]] = {
+    "capital": (
+        "서울 인천 경기 수원 성남 고양 용인 부천 안산 "
+        "안양 남양주 화성 평택 의정부 시흥 파주 김포 광명"
+    ).split(),
+    "gangwon": "강원 춘천 원주 강릉 속초".split(),
+    "chungcheong": "대전 세종 충청 충북 충남 청주 천안 아산".split(),
+    "honam": "광주 전라 전북 전남 전주 익산 군산 목포 여수 순천".split(),
+    "yeongnam": "부산 대구 울산 경상 경북 경남 창원 포항 김해 구미".split(),
+    "jeju": "제주 서귀포".split(),
+}
+
+# 오래 기다린 사람이 넘어갈 수 있는 이웃 shard
+DEFAULT_NEIGHBORS: Dict[str, Sequence[str]] = {
+    "capital": ("gangwon", "chungcheong"),
+    "gangwon": ("capital", "chungcheong", "yeongnam"),
+    "chungcheong": ("capital", "gangwon", "honam", "yeongnam"),
+    "honam": ("chungcheong", "yeongnam", "jeju"),
+    "yeongnam": ("gangwon", "chungcheong", "honam"),
+    "jeju": ("honam", "yeongnam"),
+}
+
+FALLBACK_SHARD = "etc"
+
+
+def sharding_enabled() -> bool:
+    return bool(getattr(settings, "MATCH_SHARDING", False))
+
+
+def _shards() -> Dict[str, Sequence[str]]:
+    return getattr(settings, "MATCH_SHARDS", None) or DEFAULT_SHARDS
+
+
+def _neighbors() -> Dict[str, Sequence[str]]:
+    return getattr(settings, "MATCH_SHARD_NEIGHBORS", None) or DEFAULT_NEIGHBORS
+
+
+def spill_sec() -> float:
+    return float(getattr(settings, "MATCH_SHARD_SPILL_SEC", 15))
+
+
+def all_shards() -> List[str]:
+    return list(_shards().keys()) + [FALLBACK_SHARD]
+
+
+def shard_for(region: str, address: str) -> str:
+    """
+    UserLocation.region 우선, 없으면 User.address. 못 찾으면 "etc"
+    """
+    shards = _shards()
+    for text in (region, address):
+        for word in (text or "").split():
+            for shard, prefixes in shards.items():
+                if any(word.startswith(p) for p in prefixes):
+                    return shard
+    return FALLBACK_SHARD
+
+
+def neighbors(shard: str) -> List[str]:
+    if shard == FALLBACK_SHARD:
+        # 지역을 모르는 유저는 어느 shard로든 넘어갈 수 있음
+        return list(_shards().keys())
+    return list(_neighbors().get(shard, ())) + [FALLBACK_SHARD]
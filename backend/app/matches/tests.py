@@ -0,0 +1,66 @@
+# app/matches/tests.py
+import asyncio
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from app.common import metrics
+from app.matches.consumers import SLOW_CONSUMER_CLOSE_CODE, SignalingConsumer
+from app.matches.management.commands.check_match_query_plans import (
+    hot_queries,
+    plan_verdict,
+    seed_sessions,
+)
+
+
+class MatchSessionQueryPlanTests(TestCase):
+    """
+    MatchSession hot query가 의도한 인덱스를 타는지 (풀스캔/다른 인덱스면 실패)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_ids = seed_sessions(rows=20_000, n_users=200)
+
+    def test_hot_queries_use_their_index(self):
+        cutoff = timezone.now() - timedelta(minutes=2)
+        queries = hot_queries(self.user_ids[0], self.user_ids[1], cutoff)
+        for label, (qs, index) in queries.items():
+            with self.subTest(label):
+                plan = qs.explain()
+                self.assertEqual(plan_verdict(plan, index), "ok", plan)
+
+
+class SignalingOutboxTests(SimpleTestCase):
+    """
+    상대 메시지 대기열이 넘치면 크기 그대로 두고 한 번만 4408로 닫음
+    """
+
+    def _consumer(self, maxsize: int):
+        consumer = SignalingConsumer()
+        consumer._left = False
+        consumer._closing = False
+        consumer._outbox = asyncio.Queue(maxsize=maxsize)
+        consumer.closed_with = []
+
+        async def close(code=None):
+            consumer.closed_with.append(code)
+
+        consumer.close = close
+        return consumer
+
+    def _closed_count(self) -> float:
+        key = (str(SLOW_CONSUMER_CLOSE_CODE),)
+        return metrics.SIGNALING_CLOSED._values.get(key, 0.0)
+
+    async def test_overflow_closes_once_and_stays_bounded(self):
+        consumer = self._consumer(maxsize=3)
+        before = self._closed_count()
+
+        for i in range(10):
+            await consumer._push({"type": "ice", "payload": {"k": i}})
+
+        self.assertEqual(consumer._outbox.qsize(), 3)
+        self.assertEqual(consumer.closed_with, [SLOW_CONSUMER_CLOSE_CODE])
+        self.assertEqual(self._closed_count() - before, 1)
@@ -1,14 +1,18 @@
 # app/matches/views.py
-from typing import Optional
-
 from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from .models import MatchSession
-from app.matches.services import request_match
-from app.matches.redis_store import save_session_state
+from app.matches.services import request_match, cancel_waiting
+from app.matches.redis_store import (
+    CLOSED_STATUSES,
+    delete_session_state,
+    get_session_state,
+    save_session_state,
+)
+from app.users.models import User, calc_age
 
 from app.user_locations.geocode import reverse_geocode_region
 
@@ -24,18 +28,6 @@ def fail(code: str, message: str, http_status: int = 400):
     )
 
 
-def _calc_age(user) -> Optional[int]:
-    now_year = timezone.now().year
-    if getattr(user, "birth_date", None):
-        return now_year - user.birth_date.year
-    if getattr(user, "birth_year", None):
-        try:
-            return now_year - int(user.birth_year)
-        except Exception:
-            return None
-    return None
-
-
 def _short_region(region: str) -> str:
     if not region:
         return ""
@@ -64,21 +56,34 @@ class MatchEndView(APIView):
         if not session_id:
             return fail("VALIDATION_ERROR", "sessionId is required")
 
-        session = MatchSession.objects.filter(session_id=session_id).first()
-        if not session:
+        # 권한 확인은 Redis 세션 상태 hash에서 (없으면 DB read-through)
+        state = get_session_state(session_id, member_id=request.user.id)
+        if not state:
+            # 아직 짝이 안 정해진 대기 티켓이면 대기열에서 빼고 종료 처리
+            if cancel_waiting(request.user, session_id):
+                delete_session_state(session_id)
+                return Response({"ended": True})
             return fail("SESSION_NOT_FOUND", "session not found", 404)
 
-        if (
-            session.user_a_id != request.user.id
-            and session.user_b_id != request.user.id
-        ):
+        if not state.has_member(request.user.id):
             return fail("FORBIDDEN", "not your session", 403)
 
-        if session.status not in ("ENDED", "CANCELED"):
-            session.status = "ENDED"
-            session.ended_at = timezone.now()
-            session.save(update_fields=["status", "ended_at"])
-            save_session_state(session, status="ENDED")
+        if state.status not in CLOSED_STATUSES:
+            # 상태 전이는 DB row 기준(조건부 UPDATE) -> 캐시가 늦어도 두 번 끝나지 않음
+            updated = (
+                MatchSession.objects.filter(session_id=state.session_id)
+                .exclude(status__in=CLOSED_STATUSES)
+                .update(status="ENDED", ended_at=timezone.now())
+            )
+            if updated == 1:
+                save_session_state(state, status="ENDED")
+            else:
+                # 이미 끝났거나(리퍼 CANCELED 등) row가 없음 -> 캐시를 DB 실제 상태로
+                row = MatchSession.objects.filter(session_id=state.session_id).first()
+                if row:
+                    save_session_state(row, status=row.status)
+                else:
+                    delete_session_state(state.session_id)
 
         return Response({"ended": True})
 
@@ -97,24 +102,18 @@ class CallSummaryView(APIView):
         if not session_id:
             return fail("VALIDATION_ERROR", "sessionId is required")
 
-        session = (
-            MatchSession.objects.select_related(
-                "user_a", "user_b", "user_a__location", "user_b__location"
-            )
-            .filter(session_id=session_id)
-            .first()
-        )
-        if not session:
+        state = get_session_state(session_id, member_id=request.user.id)
+        if not state:
             return fail("SESSION_NOT_FOUND", "session not found", 404)
 
-        if (
-            session.user_a_id != request.user.id
-            and session.user_b_id != request.user.id
-        ):
+        if not state.has_member(request.user.id):
             return fail("FORBIDDEN", "not your session", 403)
 
+        peer_id = state.peer_of(request.user.id)
         peer = (
-            session.user_b if session.user_a_id == request.user.id else session.user_a
+            User.objects.select_related("location").filter(id=peer_id).first()
+            if peer_id
+            else None
         )
         if not peer:
             return fail("PEER_NOT_FOUND", "peer not found", 404)
@@ -136,7 +135,7 @@ class CallSummaryView(APIView):
         peer_payload = {
             "userId": peer.id,
             "name": peer.name,
-            "age": _calc_age(peer),
+            "age": calc_age(peer.birth_date, peer.birth_year),
             "gender": getattr(peer, "gender", "") or "",
             "regionDong": _short_region(region_full),
             "profileImageUrl": getattr(peer, "profile_image_url", "") or "",
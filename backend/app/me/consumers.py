@@ -0,0 +1,64 @@
+# app/me/consumers.py
+from asgiref.sync import sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from app.common import presence
+from app.friends import fanout
+from app.config.jwt_auth_middleware import scope_user
+
+
+class PresenceConsumer(AsyncJsonWebsocketConsumer):
+    """
+    접속 상태 유지용 WebSocket (POST /api/me/presence 30초 ping 대체)
+      - URL: ws://<host>/ws/presence/?token=<ACCESS_TOKEN>
+      - 인증은 연결할 때 한 번 (JwtAuthMiddleware)
+      - 클라 -> 서버: {"type": "ping"} 30초마다 -> {"type": "pong"}
+      - 서버 -> 클라: 친구가 온라인/오프라인이 되면
+        {"type": "friend-presence", "payload": {"userId": 42, "online": true}}
+      - 소켓이 닫히면 바로 오프라인 (다른 탭/기기 연결이 남아 있으면 유지)
+    """
+
+    async def connect(self):
+        user = scope_user(self.scope)
+        if not user:
+            await self.close(code=4401)
+            return
+
+        self.user_id = user.id
+        self.group_name = fanout.presence_group(self.user_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        if await presence.connect(self.user_id, self.channel_name):
+            await self._presence_changed(True)
+        await self.send_json(
+            {"type": "presence", "payload": {"ttlSec": presence.PRESENCE_TTL_SEC}}
+        )
+
+    async def disconnect(self, close_code):
+        if not hasattr(self, "user_id"):
+            return
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        try:
+            if await presence.disconnect(self.user_id, self.channel_name):
+                await self._presence_changed(False)
+        except Exception:
+            # Redis 장애: TTL이 지나면 어차피 오프라인
+            pass
+
+    async def receive_json(self, content, **kwargs):
+        if not isinstance(content, dict) or content.get("type") != "ping":
+            return
+        if await presence.ping(self.user_id, self.channel_name):
+            # TTL이 지나 오프라인 처리됐다가 다시 살아난 경우
+            await self._presence_changed(True)
+        await self.send_json({"type": "pong"})
+
+    async def _presence_changed(self, online: bool):
+        # 나를 친구로 둔 유저들: 친구 목록 정렬(online 먼저) 갱신 + friend-presence push
+        try:
+            await sync_to_async(fanout.publish_presence)(self.user_id, online)
+        except Exception:
+            pass
+
+    async def friend_presence(self, event):
+        await self.send_json({"type": "friend-presence", "payload": event["payload"]})
@@ -0,0 +1,105 @@
+# app/user_locations/geohash.py
+from typing import List, Tuple
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+
+
+def encode(lat: float, lng: float, precision: int = 5) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # 짝수 비트 = 경도
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                bits = (bits << 1) | 1
+                lng_lo = mid
+            else:
+                bits <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_lo = mid
+            else:
+                bits <<= 1
+                lat_hi = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def bounds(cell: str) -> Tuple[float, float, float, float]:
+    """
+    return: (lat_lo, lat_hi, lng_lo, lng_hi)
+    """
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    even = True
+
+    for c in cell:
+        v = _DECODE[c]
+        for shift in range(4, -1, -1):
+            bit = (v >> shift) & 1
+            if even:
+                mid = (lng_lo + lng_hi) / 2
+                if bit:
+                    lng_lo = mid
+                else:
+                    lng_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+
+    return lat_lo, lat_hi, lng_lo, lng_hi
+
+
+def shift(cell: str, dx: int, dy: int) -> str:
+    """
+    같은 정밀도에서 (동쪽 dx칸, 북쪽 dy칸) 떨어진 셀
+    """
+    lat_lo, lat_hi, lng_lo, lng_hi = bounds(cell)
+    h = lat_hi - lat_lo
+    w = lng_hi - lng_lo
+
+    lat = (lat_lo + lat_hi) / 2 + dy * h
+    lng = (lng_lo + lng_hi) / 2 + dx * w
+
+    lat = max(-90.0 + h / 2, min(90.0 - h / 2, lat))
+    lng = (lng + 180.0) % 360.0 - 180.0
+    return encode(lat, lng, len(cell))
+
+
+def ring(cell: str, k: int) -> List[str]:
+    """
+    cell 기준 k번째 고리(체비쇼프 거리 == k)의 셀 목록. k=0이면 자기 자신.
+    """
+    if k == 0:
+        return [cell]
+
+    out = []
+    seen = set()
+    for dx in range(-k, k + 1):
+        for dy in range(-k, k + 1):
+            if max(abs(dx), abs(dy)) != k:
+                continue
+            c = shift(cell, dx, dy)
+            if c not in seen and c != cell:
+                seen.add(c)
+                out.append(c)
+    return out
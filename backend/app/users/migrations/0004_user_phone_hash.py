@@ -0,0 +1,34 @@
+# Generated by Django 4.2.27 on 2026-10-18 09:12
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def fill_phone_hash(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    batch = []
+    for user in User.objects.only('id', 'phone_number').iterator(chunk_size=1000):
+        user.phone_hash = hashlib.sha256(user.phone_number.encode('utf-8')).hexdigest()
+        batch.append(user)
+        if len(batch) >= 1000:
+            User.objects.bulk_update(batch, ['phone_hash'])
+            batch = []
+    if batch:
+        User.objects.bulk_update(batch, ['phone_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_birth_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='phone_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.RunPython(fill_phone_hash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from app.users.models import hash_phone
+
+
+def rekey_phone_hash(apps, schema_editor):
+    # 0004는 sha256만 저장함 -> 서버 키 HMAC(hash_phone)로 다시 계산
+    User = apps.get_model('users', 'User')
+    batch = []
+    for user in User.objects.only('id', 'phone_number').iterator(chunk_size=1000):
+        user.phone_hash = hash_phone(user.phone_number)
+        batch.append(user)
+        if len(batch) >= 1000:
+            User.objects.bulk_update(batch, ['phone_hash'])
+            batch = []
+    if batch:
+        User.objects.bulk_update(batch, ['phone_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_phone_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(rekey_phone_hash, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,43 @@
 # app/users/models.py
+import hashlib
+import hmac
+from typing import Optional
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils import timezone
 
 
+def key_phone_hash(digest: str) -> str:
+    """
+    클라가 보낸 sha256(번호) hex -> 서버 키로 HMAC (DB에 저장/비교하는 값)
+    번호 공간이 작아서 sha256만 저장하면 전부 대입해 볼 수 있음
+    """
+    key = getattr(settings, "PHONE_HASH_KEY", "") or settings.SECRET_KEY
+    return hmac.new(
+        key.encode("utf-8"), digest.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+
+
+def hash_phone(phone_norm: str) -> str:
+    # 연락처 가져오기용: 클라는 숫자만 남긴 번호를 sha256(hex)해서 보냄 -> 서버에서 key_phone_hash
+    return key_phone_hash(hashlib.sha256(phone_norm.encode("utf-8")).hexdigest())
+
+
+def calc_age(birth_date, birth_year, now_year: Optional[int] = None) -> Optional[int]:
+    # 해커톤용 나이 계산(정책 확정 전): birth_date 있으면 연도 기준, 없으면 birth_year
+    now_year = now_year or timezone.now().year
+    if birth_date:
+        return now_year - birth_date.year
+    if birth_year:
+        try:
+            return now_year - int(birth_year)
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
 class UserManager(BaseUserManager):
     use_in_migrations = True
 
@@ -40,6 +74,8 @@ class User(AbstractUser):
     username = None
 
     phone_number = models.CharField(max_length=20, unique=True)
+    # hash_phone(phone_number). save()에서 번호가 바뀔 때만 채움 (연락처 해시 매칭)
+    phone_hash = models.CharField(max_length=64, blank=True, default="", db_index=True)
 
     # 서비스 필드
     name = models.CharField(max_length=50)
@@ -59,5 +95,29 @@ class User(AbstractUser):
 
     objects = UserManager()
 
+    # DB에서 읽은 번호 (save에서 번호가 바뀌었는지 비교)
+    _loaded_phone = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        obj._loaded_phone = obj.__dict__.get("phone_number")
+        return obj
+
+    def save(self, *args, **kwargs):
+        # 번호를 안 읽었거나(only/defer) 저장 대상이 아니면 해시도 그대로
+        phone = self.__dict__.get("phone_number")
+        update_fields = kwargs.get("update_fields")
+        if phone is not None and (
+            update_fields is None or "phone_number" in update_fields
+        ):
+            if phone != self._loaded_phone or not self.__dict__.get("phone_hash"):
+                self.phone_hash = hash_phone(phone)
+                if update_fields is not None:
+                    kwargs["update_fields"] = set(update_fields) | {"phone_hash"}
+        super().save(*args, **kwargs)
+        if phone is not None:
+            self._loaded_phone = phone
+
     def __str__(self):
         return f"{self.id} {self.phone_number}"
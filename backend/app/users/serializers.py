@@ -1,7 +1,6 @@
 # app/users/serializers.py
 from rest_framework import serializers
-from django.utils import timezone
-from .models import User
+from .models import User, calc_age
 
 
 class UserMeSerializer(serializers.ModelSerializer):
@@ -34,14 +33,7 @@ class UserMeSerializer(serializers.ModelSerializer):
         return obj.birth_date.isoformat() if obj.birth_date else None
 
     def get_age(self, obj: User):
-        # birth_date 있으면 그걸로, 없으면 birth_year로 대충 계산
-        now_year = timezone.now().year
-        if obj.birth_date:
-            # 한국식 나이/만나이 정책 정하기 전이면 “대략”은 연도로만
-            return now_year - obj.birth_date.year
-        if obj.birth_year:
-            return now_year - obj.birth_year
-        return None
+        return calc_age(obj.birth_date, obj.birth_year)
 
     def get_region(self, obj: User):
         loc = getattr(obj, "location", None)